@@ -0,0 +1,8 @@
+@echo off
+call env\Scripts\activate
+
+REM Compare a la reference (creee avec : benchmark.bat --save-baseline)
+REM Exemple : benchmark.bat --sizes 1000 10000 100000 1000000
+python -m triangulator.benchmark --baseline benchmarks\baseline.json %*
+
+pause
@@ -0,0 +1,7 @@
+@echo off
+call env\Scripts\activate
+
+REM Exemple : service.bat --manager mon_module:manager --workers 4
+python -m triangulator.service %*
+
+pause
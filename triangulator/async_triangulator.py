@@ -0,0 +1,80 @@
+"""Triangulator asyncio : attente réseau sans thread, calcul déporté."""
+import asyncio
+import inspect
+
+from triangulator.deadline import Deadline
+from triangulator.triangulator import Triangulator
+
+
+def _triangulate_binary(triangulator, binary, engine, deadline=None):
+    """Appelle `triangulate_binary` dans un worker.
+
+    Un résultat 200 est renvoyé sous forme du tampon sérialisé : les vues
+    mémoire ne passent pas d'un processus à l'autre.
+    """
+    result = triangulator.triangulate_binary(binary, engine, deadline)
+    if result["status"] == 200:
+        return result["Triangulation"].obj
+    return result
+
+
+class AsyncTriangulator:
+    """Version asyncio de `Triangulator`.
+
+    La récupération du PointSet est attendue (`get_point_set` asynchrone ;
+    une méthode synchrone est appelée dans un thread). La désérialisation et
+    la triangulation s'exécutent dans `executor` (threads ou processus,
+    celui par défaut de la boucle si None), au plus `max_concurrency` à la
+    fois : des milliers de requêtes peuvent attendre le réseau pendant que
+    seul le calcul occupe des workers. Les dicts de statut sont ceux de
+    `Triangulator.triangulate`.
+    """
+
+    def __init__(self, pointset_manager, max_concurrency=4, executor=None,
+                 **options):
+        """Init ; `options` sont passées au `Triangulator` de calcul."""
+        self.manager = pointset_manager
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        # Sans manager ni cache : il peut être envoyé à un processus
+        self.triangulator = Triangulator(None, **options)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_pointset(self, pointset_id):
+        """Récupère le PointSet binaire : (binaire, None) ou (None, erreur)."""
+        get_point_set = self.manager.get_point_set
+        try:
+            if inspect.iscoroutinefunction(get_point_set):
+                db_result = await get_point_set(pointset_id)
+            else:
+                db_result = await asyncio.to_thread(get_point_set, pointset_id)
+        except Exception:
+            return None, Triangulator.manager_unavailable()
+        return Triangulator.read_manager_result(db_result)
+
+    async def triangulate(self, pointset_id, engine=None, timeout=None):
+        """TRIANGULATION asynchrone ; retourne un dict de statut.
+
+        `timeout` : comme `Triangulator.triangulate`, mais l'attente de la
+        récupération est abandonnée à l'échéance (504).
+        """
+        self.triangulator.get_engine(engine or self.triangulator.engine)
+        deadline = None if timeout is None else Deadline(timeout)
+
+        try:
+            binary, error = await asyncio.wait_for(
+                self.fetch_pointset(pointset_id),
+                None if deadline is None else deadline.remaining())
+        except TimeoutError:
+            return Triangulator.deadline_exceeded("PointSet not fetched in time")
+        if error is not None:
+            return error
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.executor, _triangulate_binary, self.triangulator,
+                binary, engine, deadline)
+        if isinstance(result, dict):
+            return result
+        return Triangulator.result_from_binary(result)
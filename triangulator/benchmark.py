@@ -0,0 +1,237 @@
+"""Banc de mesure des performances, par moteur, distribution et taille.
+
+Chaque phase de `Triangulator.triangulate_binary` (désérialisation,
+validation, triangulation, sérialisation) est chronométrée séparément,
+par l'observateur du Triangulator.
+L'exposant de complexité est estimé par régression sur log(n) ; les
+résultats sont comparés à une référence JSON (échec si une phase ralentit
+au-delà de la tolérance).
+
+Lancement : python -m triangulator.benchmark --sizes 1000 10000 100000
+(voir `main` ; benchmark.bat pour Windows).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+
+from triangulator.triangulator import Triangulator
+
+PHASES = ("deserialize", "validate", "triangulate", "serialize")
+ENGINES = ("bowyer_watson", "sweep_hull", "divide_conquer", "numpy")
+# Le moteur "numpy" ne passe pas à l'échelle : limité aux petites tailles
+MAX_POINTS = {"numpy": 10_000}
+# Écart absolu toléré (secondes) : évite les fausses alertes sur les
+# phases très courtes
+MIN_SLACK = 0.005
+
+
+def uniform(n, rng):
+    """Retourne n points uniformes dans un carré."""
+    return [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(n)]
+
+
+def gaussian(n, rng, clusters=10):
+    """Retourne n points en amas gaussiens."""
+    centers = [(rng.uniform(0, 1000), rng.uniform(0, 1000))
+               for _ in range(clusters)]
+    points = []
+    for i in range(n):
+        cx, cy = centers[i % clusters]
+        points.append((rng.gauss(cx, 10), rng.gauss(cy, 10)))
+    return points
+
+
+def grid(n, rng):
+    """Retourne n points d'une grille régulière (nombreux points cocirculaires)."""
+    side = math.isqrt(n - 1) + 1
+    points = [(float(i % side), float(i // side)) for i in range(n)]
+    rng.shuffle(points)
+    return points
+
+
+def circle(n, rng):
+    """Retourne n points sur un cercle, plus son centre."""
+    points = [(1000 * math.cos(2 * math.pi * k / (n - 1)),
+               1000 * math.sin(2 * math.pi * k / (n - 1)))
+              for k in range(n - 1)]
+    points.append((0.0, 0.0))
+    rng.shuffle(points)
+    return points
+
+
+def near_collinear(n, rng):
+    """Retourne n points presque alignés (bruit faible autour d'une droite)."""
+    points = []
+    for _ in range(n):
+        x = rng.uniform(0, 1000)
+        points.append((x, 0.5 * x + rng.uniform(-0.01, 0.01)))
+    return points
+
+
+DISTRIBUTIONS = {
+    "uniform": uniform,
+    "gaussian": gaussian,
+    "grid": grid,
+    "circle": circle,
+    "near_collinear": near_collinear,
+}
+
+
+def time_phases(binary, engine, **options):
+    """Chronomètre les phases de `triangulate_binary` ; retourne un dict.
+
+    Les durées sont celles transmises à l'observateur du `Triangulator`.
+    """
+    timings = {}
+
+    def record(event, value):
+        if event.endswith("_seconds"):
+            timings[event.removesuffix("_seconds")] = value
+
+    result = Triangulator(None, observer=record,
+                          **options).triangulate_binary(binary, engine)
+    if result["status"] != 200:
+        raise RuntimeError(f"{engine}: {result['error']}")
+    return timings
+
+
+def fit_exponent(sizes, times):
+    """Retourne k tel que temps ~ n^k (moindres carrés sur les logarithmes)."""
+    pairs = [(math.log(n), math.log(t))
+             for n, t in zip(sizes, times, strict=True) if t > 0]
+    if len(pairs) < 2:
+        return None
+    mx = sum(x for x, _ in pairs) / len(pairs)
+    my = sum(y for _, y in pairs) / len(pairs)
+    sxx = sum((x - mx) ** 2 for x, _ in pairs)
+    if sxx == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in pairs) / sxx
+
+
+def run(sizes, engines=ENGINES, distributions=tuple(DISTRIBUTIONS),
+        repeat=1, seed=0, log=None):
+    """Lance le banc ; retourne {"results": [...], "exponents": {...}}.
+
+    Pour chaque mesure, on garde le meilleur temps de `repeat` essais.
+    """
+    serializer = Triangulator(None)
+    results = []
+    for name in distributions:
+        for n in sizes:
+            points = DISTRIBUTIONS[name](n, random.Random(f"{seed}-{name}-{n}"))
+            binary = serializer.serialize_pointset(points)
+            for engine in engines:
+                if n > MAX_POINTS.get(engine, n):
+                    continue
+                runs = [time_phases(binary, engine)
+                        for _ in range(repeat)]
+                phases = {p: min(r[p] for r in runs) for p in PHASES}
+                results.append({"engine": engine, "distribution": name,
+                                "n": n, "phases": phases})
+                if log is not None:
+                    log(f"{engine:>15} {name:>15} {n:>9} " + " ".join(
+                        f"{p}={phases[p]:.4f}s" for p in PHASES))
+    return {"results": results, "exponents": exponents(results)}
+
+
+def exponents(results):
+    """Retourne les exposants par "moteur/distribution" et par phase."""
+    series = {}
+    for r in results:
+        series.setdefault(f"{r['engine']}/{r['distribution']}", []).append(r)
+    fitted = {}
+    for key, rows in series.items():
+        sizes = [r["n"] for r in rows]
+        fitted[key] = {p: fit_exponent(sizes, [r["phases"][p] for r in rows])
+                       for p in PHASES}
+    return fitted
+
+
+def compare(current, baseline, tolerance=0.25):
+    """Retourne les régressions de `current` par rapport à `baseline`.
+
+    Une phase régresse si elle dépasse le temps de référence de plus de
+    `tolerance` (en proportion) et de plus de `MIN_SLACK` secondes. Les
+    mesures absentes de la référence sont ignorées.
+    """
+    reference = {(r["engine"], r["distribution"], r["n"]): r["phases"]
+                 for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        ref = reference.get((r["engine"], r["distribution"], r["n"]))
+        if ref is None:
+            continue
+        for phase in PHASES:
+            before, after = ref[phase], r["phases"][phase]
+            if after > before * (1 + tolerance) and after - before > MIN_SLACK:
+                regressions.append({"engine": r["engine"],
+                                    "distribution": r["distribution"],
+                                    "n": r["n"], "phase": phase,
+                                    "baseline": before, "current": after})
+    return regressions
+
+
+def main(argv=None):
+    """Point d'entrée ; retourne 1 en cas de régression, 0 sinon.
+
+    Sans fichier de référence (`--baseline` inexistant, hors
+    `--save-baseline`), ou avec `--save-baseline` sans `--baseline`, les
+    arguments sont refusés (code 2) avant toute mesure.
+    """
+    parser = argparse.ArgumentParser(description="Triangulator benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000],
+                        help="tailles des PointSets (jusqu'à 1000000)")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES),
+                        choices=ENGINES)
+    parser.add_argument("--distributions", nargs="+",
+                        default=list(DISTRIBUTIONS), choices=DISTRIBUTIONS)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--baseline", help="référence JSON à comparer")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="enregistre les résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline requires --baseline")
+    if args.baseline and not args.save_baseline and \
+            not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline} "
+                     "(create it with --save-baseline)")
+
+    report = run(args.sizes, args.engines, args.distributions, args.repeat,
+                 log=print)
+    report["meta"] = {"python": platform.python_version(),
+                      "machine": platform.machine(),
+                      "system": platform.system()}
+    for key, fitted in sorted(report["exponents"].items()):
+        if fitted["triangulate"] is not None:
+            print(f"{key}: triangulate ~ n^{fitted['triangulate']:.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        return 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['engine']} {r['distribution']} n={r['n']} "
+                  f"{r['phase']}: {r['baseline']:.4f}s -> "
+                  f"{r['current']:.4f}s", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
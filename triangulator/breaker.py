@@ -0,0 +1,129 @@
+"""Disjoncteur (circuit breaker) autour du PointSetManager.
+
+Pendant une panne, chaque requête attendrait les délais du client avant
+d'obtenir une 503 : le disjoncteur s'ouvre quand la proportion d'échecs
+devient trop forte et répond alors immédiatement, jusqu'à un nouvel essai.
+"""
+import threading
+import time
+from collections import deque
+
+from triangulator.client import RETRY_STATUSES
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Réponses du PointSetManager comptées comme des échecs (stockage
+# indisponible, passerelle) ; un 400 ou un 404 est une réponse normale
+FAILURE_STATUSES = RETRY_STATUSES
+
+
+class CircuitBreaker:
+    """PointSetManager protégé par un disjoncteur (interface `get_point_set`).
+
+    - fermé : les appels passent ; si, parmi les `window` derniers, il y en
+      a au moins `min_calls` dont une proportion `failure_rate` a échoué,
+      le disjoncteur s'ouvre ;
+    - ouvert : pendant `reset_timeout` secondes, chaque appel reçoit une 503
+      immédiate avec "retry_after" (secondes restantes) ;
+    - semi-ouvert : `probes` appels d'essai passent, les autres sont
+      refusés ; s'ils réussissent tous il se referme, au premier échec il
+      se rouvre.
+
+    Un échec est une exception (délai, connexion) ou un statut de
+    `FAILURE_STATUSES`. Les appels commencés avant un changement d'état ne
+    comptent pas dans le nouvel état.
+    """
+
+    def __init__(self, manager, failure_rate=0.5, min_calls=10, window=20,
+                 reset_timeout=30.0, probes=1, clock=time.monotonic):
+        """Init."""
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in ]0, 1]")
+        if not 1 <= min_calls <= window:
+            raise ValueError("min_calls must be between 1 and window")
+        if probes < 1:
+            raise ValueError("probes must be at least 1")
+        self.manager = manager
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = None
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # True : succès
+        self._generation = 0
+        self._probing = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state):
+        """Change d'état (l'appelant tient le verrou)."""
+        self.state = state
+        self._generation += 1
+        self._outcomes.clear()
+        self._probing = self._probe_successes = 0
+        if state == OPEN:
+            self.opened_at = self.clock()
+
+    def retry_after(self):
+        """Retourne le nombre de secondes avant le prochain essai (0 si fermé)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def _admit(self):
+        """Retourne la génération de l'appel admis, ou None s'il est refusé."""
+        with self._lock:
+            if self.state == OPEN and \
+                    self.clock() >= self.opened_at + self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN
+                                      and self._probing >= self.probes):
+                self.rejected += 1
+                return None
+            if self.state == HALF_OPEN:
+                self._probing += 1
+            return self._generation
+
+    def _record(self, generation, ok):
+        """Enregistre l'issue d'un appel admis."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self.state == HALF_OPEN:
+                if not ok:
+                    self._transition(OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.probes:
+                        self._transition(CLOSED)
+                return
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and \
+                    failures >= self.failure_rate * len(self._outcomes):
+                self._transition(OPEN)
+
+    def open_result(self):
+        """Retourne l'erreur 503 renvoyée quand le disjoncteur refuse l'appel."""
+        return {
+            "status": 503,
+            "error": "Service unavailable: PointSetManager circuit is open",
+            "retry_after": self.retry_after(),
+        }
+
+    def get_point_set(self, pointset_id):
+        """Appelle le PointSetManager, ou échoue immédiatement (503)."""
+        generation = self._admit()
+        if generation is None:
+            return self.open_result()
+        ok = False
+        try:
+            result = self.manager.get_point_set(pointset_id)
+            ok = result["status"] not in FAILURE_STATUSES
+            return result
+        finally:
+            self._record(generation, ok)
@@ -0,0 +1,209 @@
+"""Cache des résultats de triangulation."""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Cache LRU borné en octets, avec durée de vie optionnelle.
+
+    Les entrées sont évincées de la moins récemment utilisée à la plus
+    récente dès que la somme de leurs tailles dépasse `max_bytes`. Avec
+    `ttl` (secondes), une entrée plus ancienne est ignorée et retirée.
+    Les compteurs `hits`, `misses` et `evictions` servent au suivi.
+    """
+
+    def __init__(self, max_bytes, ttl=None, clock=time.monotonic):
+        """Init."""
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # clé -> (valeur, taille, expiration)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Nombre d'entrées."""
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Vrai si `key` est en cache (sans toucher aux compteurs)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry):
+        """Vrai si l'entrée a dépassé sa durée de vie."""
+        return entry[2] is not None and entry[2] <= self.clock()
+
+    def _remove(self, key):
+        """Retire une entrée (verrou déjà pris)."""
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def get(self, key):
+        """Retourne la valeur associée à `key`, ou None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Ajoute `value` (de `size` octets) ; trop grosse, elle est ignorée."""
+        if size > self.max_bytes:
+            return False
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires)
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Retourne les compteurs du cache."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def content_key(binary, *params):
+    """Clé de contenu : empreinte BLAKE2b du PointSet binaire et des réglages.
+
+    Les réglages (moteur, traitement des doublons...) font partie de la clé
+    car ils changent le résultat.
+    """
+    h = hashlib.blake2b(binary, digest_size=16)
+    h.update(repr(params).encode())
+    return h.hexdigest()
+
+
+class DirectoryBackend:
+    """Stockage disque : un fichier par entrée, dans `path`."""
+
+    def __init__(self, path):
+        """Init."""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        """Chemin du fichier d'une clé (sous-dossier = 2 premiers caractères)."""
+        return os.path.join(self.path, key[:2], key + ".bin")
+
+    def get(self, key):
+        """Retourne les octets stockés, ou None."""
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        """Écrit l'entrée de façon atomique (fichier temporaire + rename)."""
+        target = self._file(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)  # pas de fichier temporaire orphelin
+            raise
+
+
+class SQLiteBackend:
+    """Stockage disque dans une base SQLite (une table clé -> blob)."""
+
+    def __init__(self, path):
+        """Init."""
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS triangulations "
+                               "(key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+
+    def get(self, key):
+        """Retourne les octets stockés, ou None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM triangulations WHERE key = ?",
+                (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, key, data):
+        """Ajoute ou remplace l'entrée."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO triangulations (key, data) "
+                "VALUES (?, ?)", (key, bytes(data)))
+
+    def close(self):
+        """Ferme la base."""
+        self._conn.close()
+
+
+class ContentCache:
+    """Cache adressé par contenu, partagé entre les PointSetIDs.
+
+    Les résultats sérialisés (format `Triangles` de la spec) sont gardés en
+    mémoire dans un `ResultCache`, et aussi dans `backend` s'il est fourni
+    (`DirectoryBackend` ou `SQLiteBackend`) pour survivre aux redémarrages.
+    """
+
+    def __init__(self, max_bytes, backend=None):
+        """Init."""
+        self.memory = ResultCache(max_bytes)
+        self.backend = backend
+        self.disk_hits = 0
+
+    def get(self, key):
+        """Retourne les octets associés à `key`, ou None."""
+        data = self.memory.get(key)
+        if data is None and self.backend is not None:
+            data = self.backend.get(key)
+            if data is not None:
+                self.disk_hits += 1
+                self.memory.put(key, data, len(data))
+        return data
+
+    def put(self, key, data):
+        """Enregistre `data` (octets) en mémoire et sur disque."""
+        data = bytes(data)
+        self.memory.put(key, data, len(data))
+        if self.backend is not None:
+            self.backend.put(key, data)
+
+    def stats(self):
+        """Retourne les compteurs du cache."""
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        return stats
@@ -0,0 +1,149 @@
+"""Client HTTP du PointSetManager (API décrite dans TP/point_set_manager.yml).
+
+Implémente l'interface attendue par `Triangulator` : `get_point_set`.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+# Statuts pour lesquels un GET (idempotent) est retenté
+RETRY_STATUSES = (502, 503, 504)
+
+# Connexion keep-alive fermée par le serveur avant toute réponse : la
+# requête n'a pas été traitée et peut repartir sur une nouvelle connexion
+# (RemoteDisconnected est une ConnectionResetError)
+STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError)
+
+
+class PointSetManagerClient:
+    """Client du PointSetManager avec un pool de connexions keep-alive.
+
+    Le pool est partagé entre threads : au plus `pool_size` requêtes sont
+    en cours à la fois et les connexions libres sont réutilisées.
+    `connect_timeout` et `read_timeout` (secondes) s'appliquent à chaque
+    requête. Les erreurs réseau et les statuts 502/503/504 sont retentés
+    `retries` fois, avec une attente aléatoire (jitter) croissante.
+    """
+
+    def __init__(self, base_url, pool_size=8, connect_timeout=2.0,
+                 read_timeout=10.0, retries=2, backoff=0.1,
+                 sleep=time.sleep, rng=random.random):
+        """Init."""
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url.scheme}")
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip("/")
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.rng = rng
+        self.connections_opened = 0
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def __enter__(self):
+        """Context manager."""
+        return self
+
+    def __exit__(self, *exc):
+        """Ferme les connexions à la sortie du bloc."""
+        self.close()
+
+    def _connect(self):
+        """Ouvre une connexion (délai de connexion puis délai de lecture)."""
+        cls = http.client.HTTPSConnection if self.scheme == "https" \
+            else http.client.HTTPConnection
+        conn = cls(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _request(self, path):
+        """Envoie un GET ; retourne (statut, corps).
+
+        Une connexion réutilisée peut avoir été fermée par le serveur : si
+        elle l'est avant toute réponse (`STALE_CONNECTION_ERRORS`), la
+        requête repart sur une autre connexion sans compter comme un nouvel
+        essai. Les autres erreurs, délais compris, ne sont pas renvoyées ici.
+        """
+        with self._slots:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                reused = conn is not None
+                if not reused:
+                    conn = self._connect()
+                try:
+                    conn.request("GET", path,
+                                 headers={"Accept": "application/octet-stream"})
+                    response = conn.getresponse()
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if reused:
+                        continue
+                    raise
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    raise
+                try:
+                    body = response.read()
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    raise
+                if response.will_close:
+                    conn.close()
+                else:
+                    with self._lock:
+                        self._idle.append(conn)
+                return response.status, body
+
+    @staticmethod
+    def _error_message(body):
+        """Message d'une réponse d'erreur (schéma `Error`)."""
+        try:
+            return json.loads(body)["message"]
+        except (ValueError, KeyError, TypeError):
+            return body.decode("utf-8", "replace")
+
+    def get_point_set(self, pointset_id):
+        """GET /pointset/{pointSetId}.
+
+        Retourne {"status": 200, "PointSet": binaire} ou
+        {"status": code, "error": message} ; lève une exception si le
+        PointSetManager reste injoignable après les essais.
+        """
+        path = f"{self.prefix}/pointset/{quote(str(pointset_id), safe='')}"
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                status, body = self._request(path)
+            except (OSError, http.client.HTTPException):
+                if last:
+                    raise
+            else:
+                if status == 200:
+                    return {"status": 200, "PointSet": body}
+                if status not in RETRY_STATUSES or last:
+                    return {"status": status,
+                            "error": self._error_message(body)}
+            # Attente aléatoire avant le prochain essai ("full jitter")
+            self.sleep(self.backoff * (2 ** attempt) * self.rng())
+
+    def close(self):
+        """Ferme les connexions libres du pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
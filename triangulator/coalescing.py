@@ -0,0 +1,152 @@
+"""Regroupement (single-flight) des triangulations concurrentes."""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from triangulator.deadline import Deadline, DeadlineExceeded
+
+
+class SingleFlight:
+    """Un seul calcul à la fois par clé, partagé par les appels concurrents.
+
+    Le premier appelant d'une clé fait le travail ; les suivants attendent
+    son `Future` et reçoivent le même résultat, ou la même exception. Les
+    appelants par threads (`do`) et asyncio (`do_async`) partagent les mêmes
+    calculs.
+    """
+
+    def __init__(self):
+        """Init."""
+        self._calls = {}  # clé -> Future du calcul en cours
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Retourne (future, leader) : leader vaut True pour le premier appel."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            # Un Future "en cours" ne peut plus être annulé par un appelant
+            future.set_running_or_notify_cancel()
+            self._calls[key] = future
+            return future, True
+
+    def _run(self, key, future, fn, args):
+        """Exécute le calcul et publie son résultat."""
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+        else:
+            with self._lock:
+                del self._calls[key]
+            future.set_result(result)
+
+    def in_flight(self):
+        """Nombre de calculs en cours."""
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, fn, *args, deadline=None):
+        """Appelle fn(*args), ou attend l'appel déjà en cours pour `key`.
+
+        Un appelant qui attend le calcul d'un autre abandonne à sa
+        `deadline` (`DeadlineExceeded`) ; le calcul continue pour les autres.
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, args)
+        elif deadline is not None:
+            try:
+                return future.result(deadline.remaining())
+            except TimeoutError:
+                if future.done():  # fn a levé TimeoutError elle-même
+                    raise
+                raise DeadlineExceeded(
+                    "Deadline exceeded waiting for a shared call") from None
+        return future.result()
+
+    async def do_async(self, key, fn, *args, executor=None):
+        """Comme `do` pour asyncio : fn s'exécute dans `executor`.
+
+        Les appelants en attente n'occupent pas de thread.
+        """
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(executor, self._run, key, future, fn, args)
+        return await asyncio.wrap_future(future)
+
+
+class CoalescingTriangulator:
+    """Couche autour d'un `Triangulator` qui regroupe les appels identiques.
+
+    Les requêtes concurrentes pour un même (pointSetId, moteur) ne
+    déclenchent qu'une récupération et une triangulation. Les autres
+    attributs sont ceux du `Triangulator` enveloppé.
+    """
+
+    def __init__(self, triangulator):
+        """Init."""
+        self.triangulator = triangulator
+        self.flights = SingleFlight()
+
+    def __getattr__(self, name):
+        """Délègue au `Triangulator` enveloppé."""
+        return getattr(self.triangulator, name)
+
+    def _key(self, pointset_id, engine, timeout=None):
+        """Clé de regroupement.
+
+        Le budget en fait partie : un calcul partagé n'est jamais interrompu
+        par l'échéance plus courte d'un autre appelant.
+        """
+        return pointset_id, engine or self.triangulator.engine, timeout
+
+    def _leader(self):
+        """Retourne (fn, led) : fn triangule et marque `led` si elle s'exécute.
+
+        Le `Triangulator` ne mesure le statut que pour le calcul ; les
+        appelants qui l'ont seulement attendu le mesurent ici (`_served`).
+        """
+        led = []
+
+        def triangulate(*args):
+            led.append(True)
+            return self.triangulator.triangulate(*args)
+        return triangulate, led
+
+    def _served(self, result, led):
+        """Mesure le statut d'un appelant qui a rejoint un calcul en cours."""
+        if not led:
+            self.triangulator.observe("status", result["status"])
+        return dict(result)
+
+    def triangulate(self, pointset_id, engine=None, timeout=None):
+        """Comme `Triangulator.triangulate`, regroupé par PointSet et budget.
+
+        Un appelant qui rejoint un calcul en cours l'attend au plus jusqu'à
+        sa propre échéance (`timeout` secondes après son arrivée), puis
+        reçoit une 504.
+        """
+        fn, led = self._leader()
+        try:
+            result = self.flights.do(
+                self._key(pointset_id, engine, timeout), fn,
+                pointset_id, engine, timeout,
+                deadline=None if timeout is None else Deadline(timeout))
+        except DeadlineExceeded as e:
+            self.triangulator.observe("status", 504)
+            return self.triangulator.deadline_exceeded(e.message)
+        return self._served(result, led)
+
+    async def triangulate_async(self, pointset_id, engine=None, executor=None):
+        """Version asyncio de `triangulate` (calcul dans `executor`)."""
+        fn, led = self._leader()
+        result = await self.flights.do_async(
+            self._key(pointset_id, engine), fn, pointset_id, engine,
+            executor=executor)
+        return self._served(result, led)
@@ -0,0 +1,74 @@
+"""Échéances des triangulations et annulation coopérative des moteurs.
+
+Une `Deadline` couvre la récupération et le calcul. Les moteurs la
+vérifient toutes les `CHECK_EVERY` insertions et s'arrêtent en levant
+`DeadlineExceeded` ; `estimate_seconds` permet de refuser d'emblée une
+requête qui ne peut pas tenir dans son budget.
+"""
+import math
+import os
+import time
+
+CHECK_EVERY = 1024  # insertions entre deux vérifications de l'échéance
+
+# Coût des moteurs en secondes par n·log2(n), mesuré avec benchmark.py
+# (points uniformes) puis divisé par deux : l'estimation est volontairement
+# basse, seules les requêtes sans espoir sont refusées
+COST_PER_NLOGN = {
+    "bowyer_watson": 2e-6,
+    "sweep_hull": 1.5e-6,
+    "divide_conquer": 2e-6,
+}
+# Le moteur "numpy" teste tous les triangles à chaque insertion : n²
+COST_PER_N2 = {"numpy": 5e-8}
+
+
+class DeadlineExceeded(Exception):
+    """Échéance dépassée pendant une triangulation."""
+
+    def __init__(self, message):
+        """Init."""
+        super().__init__(message)
+        self.message = message
+
+
+class Deadline:
+    """Échéance absolue, `timeout` secondes après sa création.
+
+    Sert de jeton d'annulation : les moteurs appellent `check`. Avec
+    l'horloge par défaut (`time.monotonic`, commune aux processus), elle
+    peut être envoyée à un worker.
+    """
+
+    def __init__(self, timeout, clock=time.monotonic):
+        """Init."""
+        self.clock = clock
+        self.expires = clock() + timeout
+
+    def remaining(self):
+        """Retourne le nombre de secondes restantes (0 si l'échéance est passée)."""
+        return max(0.0, self.expires - self.clock())
+
+    def expired(self):
+        """Vérifie si l'échéance est passée."""
+        return self.clock() >= self.expires
+
+    def check(self):
+        """Lève `DeadlineExceeded` si l'échéance est passée."""
+        if self.expired():
+            raise DeadlineExceeded("Deadline exceeded during triangulation")
+
+
+def estimate_seconds(n, engine):
+    """Retourne une estimation basse de la durée de triangulation de n points.
+
+    "divide_conquer" répartit ses bandes sur tous les cœurs.
+    """
+    if n < 2:
+        return 0.0
+    if engine in COST_PER_N2:
+        return COST_PER_N2[engine] * n * n
+    seconds = COST_PER_NLOGN[engine] * n * math.log2(n)
+    if engine == "divide_conquer":
+        seconds /= os.cpu_count() or 1
+    return seconds
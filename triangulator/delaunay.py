@@ -1,47 +1,512 @@
 """Module de triangulation utilisant l'algorithme de Bowyer-Watson."""
-from triangulator.geometry import circumcircle, point_in_circumcircle
+from fractions import Fraction
 
+from triangulator.deadline import CHECK_EVERY
+from triangulator.geometry import (
+    CIRCLE_ERRBOUND,
+    circumcircle_bounded,
+    incircle,
+    orient2d,
+)
+from triangulator.ordering import brio_order
 
-def bowyer_watson(points):
-    """Construit un super triangle très large pour l'algorithme de Bowyer-Watson."""
-    super_triangle = [
-        (-1e9, -1e9),
-        (1e9, -1e9),
-        (0,     1e9)
-    ]
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel (moteur "numpy" seulement)
+    np = None
 
-    triangles = [(0, 1, 2)]
-    pts = super_triangle + points  # index shift
+# Sommets du super triangle des moteurs : points à l'infini, R * u
+# (R -> +inf), dans ces directions qui entourent l'origine (sens
+# trigonométrique). Les prédicats qui les font intervenir sont des
+# polynômes en R dont on prend le signe du terme dominant : le super
+# triangle contient tout point fini, et le bord des triangles restants est
+# l'enveloppe convexe, quelle que soit l'échelle des coordonnées. Les
+# composantes sont de grands entiers impairs premiers entre eux, pour
+# qu'en pratique aucune arête entre points flottants ne leur soit parallèle.
+SUPER_DIRECTIONS = (
+    (-(2 ** 62 + 87), -(2 ** 62 + 15)),
+    (2 ** 62 + 95, -(2 ** 62 + 9)),
+    (3 ** 27, 2 ** 62 + 63),
+)
 
-    for i in range(3, len(pts)):
+# Arête opposée au sommet k : (sommet k+1, sommet k+2)
+_EDGES = ((1, 2), (2, 0), (0, 1))
+
+
+def _padd(p, q):
+    """Somme de deux polynômes (coefficients par degré croissant)."""
+    if len(p) < len(q):
+        p, q = q, p
+    r = list(p)
+    for k, c in enumerate(q):
+        r[k] += c
+    return r
+
+
+def _psub(p, q):
+    """Différence de deux polynômes."""
+    return _padd(p, [-c for c in q])
+
+
+def _pmul(p, q):
+    """Produit de deux polynômes."""
+    r = [0] * (len(p) + len(q) - 1)
+    for i, a in enumerate(p):
+        if a:
+            for j, b in enumerate(q):
+                r[i + j] += a * b
+    return r
+
+
+def _psign(p):
+    """Signe du terme dominant (0 si le polynôme est nul)."""
+    for c in reversed(p):
+        if c:
+            return 1 if c > 0 else -1
+    return 0
+
+
+def _orient_symbolic(a, b, c):
+    """Retourne le signe exact d'orient2d, points donnés par des polynômes en R."""
+    acx, acy = _psub(a[0], c[0]), _psub(a[1], c[1])
+    bcx, bcy = _psub(b[0], c[0]), _psub(b[1], c[1])
+    return _psign(_psub(_pmul(acx, bcy), _pmul(acy, bcx)))
+
+
+def _incircle_symbolic(a, b, c, d):
+    """Retourne le signe exact d'incircle, points donnés par des polynômes en R."""
+    adx, ady = _psub(a[0], d[0]), _psub(a[1], d[1])
+    bdx, bdy = _psub(b[0], d[0]), _psub(b[1], d[1])
+    cdx, cdy = _psub(c[0], d[0]), _psub(c[1], d[1])
+    alift = _padd(_pmul(adx, adx), _pmul(ady, ady))
+    blift = _padd(_pmul(bdx, bdx), _pmul(bdy, bdy))
+    clift = _padd(_pmul(cdx, cdx), _pmul(cdy, cdy))
+    det = _padd(_padd(
+        _pmul(alift, _psub(_pmul(bdx, cdy), _pmul(cdx, bdy))),
+        _pmul(blift, _psub(_pmul(cdx, ady), _pmul(adx, cdy)))),
+        _pmul(clift, _psub(_pmul(adx, bdy), _pmul(bdx, ady))))
+    return _psign(det)
+
+
+def _symbolic(pts, i):
+    """Coordonnées du sommet i en polynômes de R : ([x0, x1], [y0, y1])."""
+    if i < 3:
+        dx, dy = SUPER_DIRECTIONS[i]
+        return [0, dx], [0, dy]
+    x, y = pts[i]
+    return [Fraction(x)], [Fraction(y)]
+
+
+def incircle_indexed(pts, a, b, c, d):
+    """Vérifie si le sommet d est dans le cercle de (a, b, c) (indices).
+
+    `pts[0:3]` est le super triangle à l'infini (voir `SUPER_DIRECTIONS`).
+    Même convention que `incircle` : (a, b, c) dans le sens
+    trigonométrique, résultat > 0 à l'intérieur.
+    """
+    if a >= 3 and b >= 3 and c >= 3 and d >= 3:
+        return incircle(pts[a], pts[b], pts[c], pts[d])
+    if d >= 3 and (a < 3) + (b < 3) + (c < 3) == 1:
+        # Cercle passant par un point à l'infini : c'est le demi-plan à
+        # gauche de l'arête finie (le terme dominant est orient2d)
+        while c >= 3:
+            a, b, c = b, c, a
+        o = orient2d(pts[a], pts[b], pts[d])
+        if o:
+            return o
+        # Sur la droite (a, b) : à l'intérieur seulement entre a et b
+        (ax, ay), (bx, by), (dx, dy) = pts[a], pts[b], pts[d]
+        between = ax < dx < bx or bx < dx < ax or \
+            ay < dy < by or by < dy < ay
+        return 1 if between else -1
+    if d >= 3 and (a < 3) + (b < 3) + (c < 3) == 2:
+        # Deux points à l'infini u, v : le cercle tend vers la droite passant
+        # par le sommet fini c, orthogonale au centre w du cercle (0, u, v) ;
+        # d est à l'intérieur du côté de w
+        while c < 3:
+            a, b, c = b, c, a
+        wx, wy = _SUPER_CENTERS[a, b]
+        (cx, cy), (dx, dy) = pts[c], pts[d]
+        s = (Fraction(dx) - Fraction(cx)) * wx + \
+            (Fraction(dy) - Fraction(cy)) * wy
+        if s:
+            return 1 if s > 0 else -1
+    return _incircle_symbolic(*(_symbolic(pts, k) for k in (a, b, c, d)))
+
+
+def _super_center(u, v):
+    """Retourne un multiple positif du centre du cercle passant par 0, u et v."""
+    (ux, uy), (vx, vy) = u, v
+    u2, v2 = ux * ux + uy * uy, vx * vx + vy * vy
+    sign = 1 if ux * vy - uy * vx > 0 else -1
+    return sign * (vy * u2 - uy * v2), sign * (ux * v2 - vx * u2)
+
+
+_SUPER_CENTERS = {(i, j): _super_center(SUPER_DIRECTIONS[i], SUPER_DIRECTIONS[j])
+                  for i in range(3) for j in range(3) if i != j}
+
+
+class TriangleMesh:
+    """Maillage triangulaire avec liens de voisinage.
+
+    Le triangle t occupe les cases 3*t, 3*t+1 et 3*t+2 de `vertices`
+    (sens trigonométrique). `neighbours[3*t + k]` est le triangle adjacent
+    par l'arête opposée au sommet k, ou -1 s'il n'y en a pas.
+    `circles[t]` met en cache le cercle circonscrit (xc, yc, r², err) du
+    triangle t, calculé une seule fois à sa création ; il sert de filtre
+    rapide, les cas à moins de err du cercle sont tranchés par `incircle`.
+    Les indices 0, 1 et 2 de `points` sont ceux du super triangle, dont
+    les sommets sont à l'infini (voir `SUPER_DIRECTIONS`) : les prédicats
+    passent par `orient` et `incircle`, et les triangles qui les touchent
+    n'ont pas de cercle en cache.
+    """
+
+    def __init__(self, points):
+        """Initialise le maillage avec le seul super triangle.
+
+        `points` est une liste de (x, y) ou un tableau NumPy (N, 2).
+        """
+        if hasattr(points, "tolist"):
+            points = points.tolist()  # conversion en bloc, côté C
+        self.points = list(SUPER_DIRECTIONS) + list(points)
+        self.vertices = [0, 1, 2]
+        self.neighbours = [-1, -1, -1]
+        self.circles = [None]
+        self.free = []  # cases libérées, réutilisées en priorité
+        self.last = 0   # dernier triangle créé, point de départ de la marche
+
+    def orient(self, a, b, p):
+        """Retourne orient2d pour l'arête a -> b (indices) et le point fini p."""
+        pts = self.points
+        if a >= 3 and b >= 3:
+            return orient2d(pts[a], pts[b], p)
+        return _orient_symbolic(_symbolic(pts, a), _symbolic(pts, b),
+                                ([Fraction(p[0])], [Fraction(p[1])]))
+
+    def incircle(self, a, b, c, d):
+        """Vérifie si le sommet d est dans le cercle de (a, b, c) (indices).
+
+        Voir `incircle_indexed`.
+        """
+        return incircle_indexed(self.points, a, b, c, d)
+
+    def circle(self, a, b, c):
+        """Cercle (borné) à mettre en cache ; None si un sommet est à l'infini."""
+        if a < 3 or b < 3 or c < 3:
+            return None
+        pts = self.points
+        return circumcircle_bounded(pts[a], pts[b], pts[c])
+
+    def _new_triangle(self):
+        """Réserve une case pour un triangle."""
+        if self.free:
+            return self.free.pop()
+        self.vertices.extend((-1, -1, -1))
+        self.neighbours.extend((-1, -1, -1))
+        self.circles.append(None)
+        return len(self.vertices) // 3 - 1
+
+    def _locate_scan(self, p):
+        """Recherche linéaire, utilisée seulement si la marche échoue."""
+        v = self.vertices
+        for t in range(len(v) // 3):
+            if v[3 * t] < 0:
+                continue
+            for k1, k2 in _EDGES:
+                if self.orient(v[3 * t + k1], v[3 * t + k2], p) < 0:
+                    break
+            else:
+                return t
+        raise ValueError("Point outside of the super triangle")
+
+    def locate(self, p):
+        """Marche depuis le dernier triangle créé jusqu'au triangle contenant p."""
+        pts = self.points
+        v = self.vertices
+        nb = self.neighbours
+        t = self.last
+        max_steps = len(v) // 3
+        for _ in range(max_steps):
+            base = 3 * t
+            for k, (k1, k2) in enumerate(_EDGES):
+                a, b = v[base + k1], v[base + k2]
+                o = orient2d(pts[a], pts[b], p) if a >= 3 and b >= 3 \
+                    else self.orient(a, b, p)
+                # p est de l'autre côté de l'arête : on traverse
+                if o < 0:
+                    t = nb[base + k]
+                    break
+            else:
+                return t
+            if t < 0:
+                raise ValueError("Point outside of the super triangle")
+        # La marche tourne en rond (erreurs d'arrondi)
+        return self._locate_scan(p)
+
+    def insert(self, i):
+        """Insère le point d'indice i (indice dans `points`)."""
+        v = self.vertices
+        nb = self.neighbours
+        circles = self.circles
+        pts = self.points
         p = pts[i]
-        bad_triangles = []
-
-        # Trouver les triangles dont le cercle contient p
-        for tri in triangles:
-            c = circumcircle(pts[tri[0]], pts[tri[1]], pts[tri[2]])
-            if c and point_in_circumcircle(p, c):
-                bad_triangles.append(tri)
-
-        #Trouver la "cavité"
-        edges = []
-        for tri in bad_triangles:
-            for e in [(tri[0], tri[1]), (tri[1], tri[2]), (tri[2], tri[0])]:
-                if e in edges:
-                    edges.remove(e)
+        px, py = p
+
+        # Cavité : parcours en largeur depuis le triangle contenant p
+        start = self.locate(p)
+        bad = {start}
+        cavity = [start]
+        for t in cavity:  # la liste grandit pendant le parcours
+            for k in range(3):
+                n = nb[3 * t + k]
+                if n < 0 or n in bad:
+                    continue
+                c = circles[n]
+                if c is not None:
+                    # Filtre : distances au carré, hors de la marge d'erreur
+                    dd = (px - c[0]) ** 2 + (py - c[1]) ** 2 - c[2]
+                    if dd > c[3]:
+                        continue
+                    inside = dd < -c[3]
                 else:
-                    edges.append(e)
+                    inside = False
+                if not inside:
+                    j = 3 * n
+                    inside = self.incircle(v[j], v[j + 1], v[j + 2], i) > 0
+                if inside:
+                    bad.add(n)
+                    cavity.append(n)
+
+        # Bord de la cavité : (a, b, voisin extérieur, case du voisin)
+        boundary = []
+        for t in cavity:
+            base = 3 * t
+            for k, (k1, k2) in enumerate(_EDGES):
+                n = nb[base + k]
+                if n in bad:
+                    continue
+                slot = -1
+                if n >= 0:
+                    slot = 3 * n + nb[3 * n:3 * n + 3].index(t)
+                boundary.append((v[base + k1], v[base + k2], n, slot))
+
+        # Re-tesseler en réutilisant les cases des triangles "mauvais"
+        for t in cavity[len(boundary):]:
+            v[3 * t:3 * t + 3] = (-1, -1, -1)
+            circles[t] = None
+            self.free.append(t)
+        slots = cavity[:len(boundary)]
+        while len(slots) < len(boundary):
+            slots.append(self._new_triangle())
+
+        by_start = {}
+        by_end = {}
+        for (a, b, n, slot), t in zip(boundary, slots, strict=True):
+            v[3 * t:3 * t + 3] = (a, b, i)
+            circles[t] = None if a < 3 or b < 3 else \
+                circumcircle_bounded(pts[a], pts[b], p)
+            nb[3 * t + 2] = n
+            if slot >= 0:
+                nb[slot] = t
+            by_start[a] = t
+            by_end[b] = t
+        for (a, b, _, _), t in zip(boundary, slots, strict=True):
+            nb[3 * t] = by_start[b]    # arête (b, i)
+            nb[3 * t + 1] = by_end[a]  # arête (i, a)
+
+        self.last = slots[-1]
+
+    def legalize(self, edges):
+        """Rétablit la propriété de Delaunay par bascules d'arêtes (Lawson).
+
+        `edges` est une liste de (t, a, b) : arête orientée a -> b du
+        triangle t. Une entrée périmée (arête déjà basculée) est ignorée ;
+        les arêtes extérieures d'une bascule sont vérifiées à leur tour.
+        Retourne le nombre de bascules.
+        """
+        v = self.vertices
+        nb = self.neighbours
+        flips = 0
+        while edges:
+            t, a, b = edges.pop()
+            tri = v[3 * t:3 * t + 3]
+            if a not in tri:
+                continue
+            k = (tri.index(a) + 2) % 3  # sommet opposé à l'arête a -> b
+            if v[3 * t + (k + 2) % 3] != b:
+                continue
+            n = nb[3 * t + k]
+            if n < 0:
+                continue
+            m = v[3 * n:3 * n + 3].index(b) - 1  # sommet opposé dans n
+            m %= 3
+            p, q = v[3 * t + k], v[3 * n + m]
+            if self.incircle(p, a, b, q) <= 0:
+                continue
 
-        # Retirer les triangles "mauvais"
-        for tri in bad_triangles:
-            triangles.remove(tri)
+            # (p, a, b) + (q, b, a) -> (p, a, q) + (q, b, p)
+            x_pa = nb[3 * t + (k + 2) % 3]
+            x_bp = nb[3 * t + (k + 1) % 3]
+            x_aq = nb[3 * n + (m + 1) % 3]
+            x_qb = nb[3 * n + (m + 2) % 3]
+            v[3 * t:3 * t + 3] = (p, a, q)
+            nb[3 * t:3 * t + 3] = (x_aq, n, x_pa)
+            v[3 * n:3 * n + 3] = (q, b, p)
+            nb[3 * n:3 * n + 3] = (x_bp, t, x_qb)
+            if x_aq >= 0:
+                nb[3 * x_aq + nb[3 * x_aq:3 * x_aq + 3].index(n)] = t
+            if x_bp >= 0:
+                nb[3 * x_bp + nb[3 * x_bp:3 * x_bp + 3].index(t)] = n
+            self.circles[t] = self.circle(p, a, q)
+            self.circles[n] = self.circle(q, b, p)
+            edges += [(t, a, q), (t, p, a), (n, q, b), (n, b, p)]
+            flips += 1
+        return flips
 
-        # Re-tesseler les nouvelles faces
-        for e in edges:
-            triangles.append((e[0], e[1], i))
+    def triangles(self):
+        """Retourne les triangles vivants (indices dans `points`)."""
+        v = self.vertices
+        return [(v[j], v[j + 1], v[j + 2])
+                for j in range(0, len(v), 3) if v[j] >= 0]
+
+
+def bowyer_watson(points, deadline=None):
+    """Triangulation de Delaunay incrémentale (Bowyer-Watson).
+
+    Les points sont insérés dans l'ordre BRIO (voir `brio_order`) pour que
+    la marche de localisation reste courte ; l'ordre n'est qu'une
+    permutation des indices, les triangles gardent les indices d'origine.
+    `deadline` (une `Deadline`) est vérifiée toutes les `CHECK_EVERY`
+    insertions.
+    """
+    mesh = TriangleMesh(points)
+
+    for k, i in enumerate(brio_order(mesh.points[3:])):
+        if deadline is not None and k % CHECK_EVERY == 0:
+            deadline.check()
+        mesh.insert(i + 3)
 
     # Retirer les triangles contenant des sommets du super-triangle
-    triangles = [t for t in triangles if all(v >= 3 for v in t)]
+    # et nettoyer les indices (décalage de 3)
+    return [(a - 3, b - 3, c - 3) for (a, b, c) in mesh.triangles()
+            if a >= 3 and b >= 3 and c >= 3]
+
+
+def bowyer_watson_numpy(points, deadline=None):
+    """Bowyer-Watson vectorisé avec NumPy (moteur de référence, O(n²)).
+
+    Les triangles et leurs cercles circonscrits sont rangés en structure de
+    tableaux (`tri`, `cx`, `cy`, `r2`, `err`). Pour chaque point inséré, les
+    "mauvais" triangles sont trouvés par une seule comparaison vectorisée
+    des distances au carré, sans boucle Python sur les triangles ; seuls
+    les cas à moins de `err` du cercle passent par `incircle`. Cette
+    comparaison porte sur tous les triangles à chaque insertion : le coût
+    est quadratique, le moteur sert de référence et pour les petits
+    PointSets, pas pour les gros (préférer "bowyer_watson").
+    Les triangles ayant un sommet du super triangle à l'infini
+    (`SUPER_DIRECTIONS`) n'ont pas de cercle fini : ils sont testés un par
+    un avec `incircle_indexed`.
+    Retourne un tableau (T, 3) d'indices. `deadline` : comme `bowyer_watson`.
+    """
+    pts = np.concatenate((np.zeros((3, 2)),
+                          np.asarray(points, dtype=np.float64).reshape(-1, 2)))
+    xs = np.ascontiguousarray(pts[:, 0])
+    ys = np.ascontiguousarray(pts[:, 1])
+    coords = list(SUPER_DIRECTIONS) + pts[3:].tolist()  # prédicats exacts
+    n = len(pts)
+
+    # Une triangulation de n points a moins de 2n triangles
+    cap = 2 * n + 8
+    tri = np.full((cap, 3), -1, dtype=np.int64)
+    cx = np.zeros(cap)
+    cy = np.zeros(cap)
+    r2 = np.full(cap, -1.0)  # r² < 0 et err = 0 : jamais "mauvaise"
+    err = np.zeros(cap)
+    tri[0] = (0, 1, 2)
+    ghosts = {0}  # cases des triangles ayant un sommet à l'infini
+    used = 1
+    edge_idx = np.array([[0, 1], [1, 2], [2, 0]])
+
+    for i in range(3, n):
+        if deadline is not None and i % CHECK_EVERY == 3:
+            deadline.check()
+        px = xs[i]
+        py = ys[i]
+        p = coords[i]
+
+        # Triangles dont le cercle contient p
+        dd = (cx[:used] - px) ** 2 + (cy[:used] - py) ** 2 - r2[:used]
+        bad = dd < -err[:used]
+        for t in np.flatnonzero(np.abs(dd) <= err[:used]).tolist():
+            a, b, c = tri[t].tolist()
+            bad[t] = incircle(coords[a], coords[b], coords[c], p) > 0
+        for t in ghosts:
+            a, b, c = tri[t].tolist()
+            bad[t] = incircle_indexed(coords, a, b, c, i) > 0
+        bad = np.flatnonzero(bad)
+        if not len(bad):
+            raise ValueError("Point outside of the super triangle")
+
+        # Cavité : arêtes des mauvais triangles sans arête opposée
+        edges = tri[bad][:, edge_idx].reshape(-1, 2)
+        code = edges[:, 0] * n + edges[:, 1]
+        edges = edges[~np.isin(code, edges[:, 1] * n + edges[:, 0])]
+
+        # Cases : celles des mauvais triangles, puis de nouvelles
+        ghosts.difference_update(bad.tolist())
+        k = len(edges)
+        r2[bad[k:]] = -1.0
+        err[bad[k:]] = 0.0
+        tri[bad[k:]] = -1
+        slots = bad[:k]
+        if k > len(slots):
+            extra = k - len(slots)
+            if used + extra > cap:
+                grow = max(cap, extra)
+                tri = np.concatenate((tri, np.full((grow, 3), -1, np.int64)))
+                cx = np.concatenate((cx, np.zeros(grow)))
+                cy = np.concatenate((cy, np.zeros(grow)))
+                r2 = np.concatenate((r2, np.full(grow, -1.0)))
+                err = np.concatenate((err, np.zeros(grow)))
+                cap += grow
+            slots = np.concatenate((slots, np.arange(used, used + extra)))
+            used += extra
+
+        # Nouveaux triangles (a, b, i) et leurs cercles, en bloc
+        # (même calcul que circumcircle_bounded, relatif à p)
+        a = edges[:, 0]
+        b = edges[:, 1]
+        tri[slots, 0] = a
+        tri[slots, 1] = b
+        tri[slots, 2] = i
+        ax, ay = xs[a] - px, ys[a] - py
+        bx, by = xs[b] - px, ys[b] - py
+        d = 2 * (ax * by - ay * bx)
+        a2 = ax * ax + ay * ay
+        b2 = bx * bx + by * by
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ux = (by * a2 - ay * b2) / d
+            uy = (ax * b2 - bx * a2) / d
+            rr = ux * ux + uy * uy
+            l2 = np.maximum(np.maximum(a2, b2), (ax - bx) ** 2 + (ay - by) ** 2)
+            uxa, uya = ux + px, uy + py
+            tol = CIRCLE_ERRBOUND * rr * (
+                1.0 + l2 / np.abs(d) + (np.abs(uxa) + np.abs(uya)) / np.sqrt(rr))
+        # Triangle presque plat : toujours tranché par incircle
+        flat = ~np.isfinite(tol)
+        uxa[flat] = px
+        uya[flat] = py
+        rr[flat] = 0.0
+        tol[flat] = np.inf
+        # Triangle à l'infini : pas de cercle fini, testé à part
+        ghost = (a < 3) | (b < 3)
+        rr[ghost] = -1.0
+        tol[ghost] = 0.0
+        ghosts.update(slots[ghost].tolist())
+        cx[slots] = uxa
+        cy[slots] = uya
+        r2[slots] = rr
+        err[slots] = tol
 
-    # Nettoyage des indices
-    return [(a-3, b-3, c-3) for (a, b, c) in triangles]
+    live = tri[:used]
+    return live[(live >= 3).all(axis=1)] - 3
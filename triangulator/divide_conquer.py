@@ -0,0 +1,447 @@
+"""Triangulation de Delaunay par division (Guibas-Stolfi), en parallèle.
+
+Les points sont triés (x puis y) et découpés en bandes verticales ; chaque
+bande est triangulée par un processus (balayage d'enveloppe), puis les
+bandes voisines sont fusionnées de gauche à droite le long de leur couture
+par la fusion de Guibas et Stolfi.
+
+Les workers forment un pool persistant ; les coordonnées triées et les
+maillages des bandes passent par `multiprocessing.shared_memory` au lieu
+d'être sérialisés par pickle.
+
+Le maillage est une structure quad-edge (Guibas et Stolfi, 1985) stockée
+dans des listes : l'arête e (e = 4q + r) a pour rotation `rot(e)`, pour
+symétrique `e ^ 2`, `onext[e]` est l'arête suivante (sens trigonométrique)
+autour de son origine `org[e]`.
+"""
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from multiprocessing import shared_memory
+
+from triangulator.geometry import incircle, orient2d
+from triangulator.sweephull import SweepHull, SweepHullFailed
+
+SLAB_MIN = 10_000  # en dessous, une bande par processus ne vaut pas le coût
+# Entrées de `onext` (et de `org`) par point d'une bande : une triangulation
+# de m points a au plus 3m arêtes, de 4 entrées chacune
+SLOTS_PER_POINT = 12
+
+_pools = {}  # nombre de workers -> ProcessPoolExecutor persistant
+_pools_lock = threading.Lock()
+
+
+def rot(e):
+    """Retourne l'arête duale, tournée d'un quart de tour."""
+    return (e & ~3) | ((e + 1) & 3)
+
+
+def invrot(e):
+    """Retourne la rotation inverse de `rot`."""
+    return (e & ~3) | ((e + 3) & 3)
+
+
+class QuadEdgeMesh:
+    """Maillage quad-edge et opérations de Guibas-Stolfi."""
+
+    def __init__(self, points):
+        """Init ; `points` doivent être triés (x puis y) et distincts."""
+        self.points = points
+        self.onext = []
+        self.org = []
+        self.alive = []  # par quad-edge
+
+    def make_edge(self, a, b):
+        """Crée une arête isolée de a vers b ; retourne son identifiant."""
+        e = len(self.onext)
+        self.onext += [e, e + 3, e + 2, e + 1]
+        self.org += [a, -1, b, -1]
+        self.alive.append(True)
+        return e
+
+    def splice(self, a, b):
+        """Opération `Splice` : joint ou sépare les anneaux de a et b."""
+        onext = self.onext
+        alpha = rot(onext[a])
+        beta = rot(onext[b])
+        onext[a], onext[b] = onext[b], onext[a]
+        onext[alpha], onext[beta] = onext[beta], onext[alpha]
+
+    def dest(self, e):
+        """Retourne la destination de e."""
+        return self.org[e ^ 2]
+
+    def lnext(self, e):
+        """Retourne l'arête suivante autour de la face gauche de e."""
+        return rot(self.onext[invrot(e)])
+
+    def connect(self, a, b):
+        """Ajoute une arête de dest(a) vers org(b) (même face gauche)."""
+        e = self.make_edge(self.dest(a), self.org[b])
+        self.splice(e, self.lnext(a))
+        self.splice(e ^ 2, b)
+        return e
+
+    def ccw(self, a, b, c):
+        """Vérifie que les sommets a, b, c tournent dans le sens trigonométrique."""
+        if a in (b, c) or b == c:
+            return False  # évite le calcul exact d'un cas dégénéré
+        p = self.points
+        return orient2d(p[a], p[b], p[c]) > 0
+
+    def in_circle(self, a, b, c, d):
+        """Vérifie que d est strictement dans le cercle de (a, b, c)."""
+        if d in (a, b, c):
+            return False
+        p = self.points
+        return incircle(p[a], p[b], p[c], p[d]) > 0
+
+    def triangulate(self, lo, hi):
+        """Triangule les sommets lo..hi-1 (au moins 2) ; retourne (ldo, rdo).
+
+        `ldo` part du sommet le plus à gauche et `rdo` du plus à droite, le
+        long de l'enveloppe convexe (intérieur à gauche de ldo, à droite
+        de rdo).
+        """
+        n = hi - lo
+        if n == 2:
+            a = self.make_edge(lo, lo + 1)
+            return a, a ^ 2
+        if n == 3:
+            a = self.make_edge(lo, lo + 1)
+            b = self.make_edge(lo + 1, lo + 2)
+            self.splice(a ^ 2, b)
+            if self.ccw(lo, lo + 1, lo + 2):
+                self.connect(b, a)
+                return a, b ^ 2
+            if self.ccw(lo, lo + 2, lo + 1):
+                c = self.connect(b, a)
+                return c ^ 2, c
+            return a, b ^ 2  # trois points alignés
+        mid = (lo + hi) // 2
+        ldo, ldi = self.triangulate(lo, mid)
+        rdi, rdo = self.triangulate(mid, hi)
+        return self.merge(ldo, ldi, rdi, rdo)
+
+    def merge(self, ldo, ldi, rdi, rdo):
+        """Fusionne deux triangulations séparées ; retourne (ldo, rdo).
+
+        Tous les sommets de gauche précèdent (x puis y) ceux de droite.
+        Boucle critique : `rot`, `dest`, `oprev`... y sont écrits en ligne.
+        """
+        org, onext, alive, p = self.org, self.onext, self.alive, self.points
+
+        def ccw(a, b, c):
+            if a in (b, c) or b == c:
+                return False  # évite le calcul exact d'un cas dégénéré
+            return orient2d(p[a], p[b], p[c]) > 0
+
+        def in_circle(a, b, c, d):
+            if d in (a, b, c):
+                return False
+            return incircle(p[a], p[b], p[c], p[d]) > 0
+
+        def splice(a, b):
+            alpha = onext[a]
+            alpha = (alpha & ~3) | ((alpha + 1) & 3)
+            beta = onext[b]
+            beta = (beta & ~3) | ((beta + 1) & 3)
+            onext[a], onext[b] = onext[b], onext[a]
+            onext[alpha], onext[beta] = onext[beta], onext[alpha]
+
+        def oprev(e):
+            e = onext[(e & ~3) | ((e + 1) & 3)]
+            return (e & ~3) | ((e + 1) & 3)
+
+        def connect(a, b):
+            # lnext(a) = rot(onext[invrot(a)])
+            la = onext[(a & ~3) | ((a + 3) & 3)]
+            la = (la & ~3) | ((la + 1) & 3)
+            e = len(onext)
+            onext.extend((e, e + 3, e + 2, e + 1))
+            org.extend((org[a ^ 2], -1, org[b], -1))
+            alive.append(True)
+            splice(e, la)
+            splice(e ^ 2, b)
+            return e
+
+        def delete_edge(e):
+            splice(e, oprev(e))
+            splice(e ^ 2, oprev(e ^ 2))
+            alive[e >> 2] = False
+
+        # Tangente commune inférieure
+        while True:
+            if ccw(org[rdi], org[ldi], org[ldi ^ 2]):
+                ldi = onext[(ldi & ~3) | ((ldi + 3) & 3)]
+                ldi = (ldi & ~3) | ((ldi + 1) & 3)
+            elif ccw(org[ldi], org[rdi ^ 2], org[rdi]):
+                rdi = onext[rdi ^ 2]
+            else:
+                break
+
+        basel = connect(rdi ^ 2, ldi)
+        if org[ldi] == org[ldo]:
+            ldo = basel ^ 2
+        if org[rdi] == org[rdo]:
+            rdo = basel
+
+        # Remontée de la couture
+        while True:
+            b_org, b_dest = org[basel], org[basel ^ 2]
+            lcand = onext[basel ^ 2]
+            l_valid = ccw(org[lcand ^ 2], b_dest, b_org)
+            if l_valid:
+                while in_circle(b_dest, b_org, org[lcand ^ 2],
+                                org[onext[lcand] ^ 2]):
+                    t = onext[lcand]
+                    delete_edge(lcand)
+                    lcand = t
+            rcand = oprev(basel)
+            r_valid = ccw(org[rcand ^ 2], b_dest, b_org)
+            if r_valid:
+                while in_circle(b_dest, b_org, org[rcand ^ 2],
+                                org[oprev(rcand) ^ 2]):
+                    t = oprev(rcand)
+                    delete_edge(rcand)
+                    rcand = t
+            if not l_valid and not r_valid:
+                return ldo, rdo
+            if not l_valid or (r_valid and in_circle(
+                    org[lcand ^ 2], org[lcand], org[rcand], org[rcand ^ 2])):
+                basel = connect(rcand, basel ^ 2)
+            else:
+                basel = connect(basel ^ 2, lcand ^ 2)
+
+    def export(self):
+        """Retourne (onext, org) sans les arêtes supprimées."""
+        new_id = {}
+        for q, alive in enumerate(self.alive):
+            if alive:
+                new_id[q] = len(new_id)
+        onext, org = [], []
+        for q in new_id:
+            for r in range(4):
+                e = self.onext[4 * q + r]
+                onext.append(4 * new_id[e >> 2] + (e & 3))
+                org.append(self.org[4 * q + r])
+        return onext, org, new_id
+
+    def extend(self, onext, org, vertex_offset):
+        """Ajoute un maillage exporté ; retourne le décalage de ses arêtes."""
+        edge_offset = len(self.onext)
+        self.onext += [e + edge_offset for e in onext]
+        self.org += [v if v < 0 else v + vertex_offset for v in org]
+        self.alive += [True] * (len(onext) // 4)
+        return edge_offset
+
+    def triangles(self, outer):
+        """Retourne les faces triangulaires, hors face extérieure.
+
+        `outer` est une arête dont la face gauche est l'extérieur (`rdo`).
+        """
+        onext, org = self.onext, self.org
+        seen = bytearray(len(onext))
+        e = outer
+        while not seen[e]:
+            seen[e] = 1
+            e = onext[(e & ~3) | ((e + 3) & 3)]  # lnext
+            e = (e & ~3) | ((e + 1) & 3)
+        triangles = []
+        for q, alive in enumerate(self.alive):
+            if not alive:
+                continue
+            for a in (4 * q, 4 * q + 2):
+                if seen[a]:
+                    continue
+                b = onext[(a & ~3) | ((a + 3) & 3)]
+                b = (b & ~3) | ((b + 1) & 3)
+                c = onext[(b & ~3) | ((b + 3) & 3)]
+                c = (c & ~3) | ((c + 1) & 3)
+                seen[a] = seen[b] = seen[c] = 1
+                triangles.append((org[a], org[b], org[c]))
+        return triangles
+
+
+def from_halfedges(triangles, halfedges, n):
+    """Convertit une triangulation en demi-arêtes (`SweepHull`) en quad-edges.
+
+    Retourne (onext, org, ldo, rdo) ; les sommets 0 et n - 1 doivent être le
+    plus à gauche et le plus à droite.
+    """
+    m = len(triangles)
+    qe = [0] * m  # demi-arête -> arête quad-edge de même sens
+    org = []
+    hull_out = {}  # sommet -> demi-arête d'enveloppe qui en part
+    for h in range(m):
+        twin = halfedges[h]
+        if twin == -1:
+            hull_out[triangles[h]] = h
+        if twin == -1 or h < twin:
+            e = len(org)
+            qe[h] = e
+            nh = h - 2 if h % 3 == 2 else h + 1
+            org += [triangles[h], -1, triangles[nh], -1]
+            if twin != -1:
+                qe[twin] = e ^ 2
+
+    onext = [0] * len(org)
+    rdo = -1
+    for h in range(m):
+        # a -> b dans le triangle (a, b, c) : a -> c est la suivante autour de a
+        ph = h + 2 if h % 3 == 0 else h - 1
+        onext[qe[h]] = qe[ph] ^ 2
+        if halfedges[h] == -1:
+            # b -> a borde l'extérieur : la suivante autour de b est
+            # l'arête d'enveloppe qui part de b
+            b = triangles[h - 2 if h % 3 == 2 else h + 1]
+            onext[qe[h] ^ 2] = qe[hull_out[b]]
+            if b == n - 1:
+                rdo = qe[h] ^ 2
+    # Anneaux duaux : oprev(f) = e  <=>  onext[rot(f)] = invrot(e)
+    for e in range(0, len(org), 2):
+        onext[rot(onext[e])] = invrot(e)
+    return onext, org, qe[hull_out[0]], rdo
+
+
+def _triangulate_slab(points, deadline=None):
+    """Triangule une bande dans un worker ; retourne (onext, org, ldo, rdo).
+
+    La bande est triangulée par balayage (`SweepHull`) ; des points tous
+    alignés, que le balayage ne traite pas, ou un échec du balayage
+    (`SweepHullFailed`) passent par Guibas-Stolfi.
+    """
+    try:
+        hull = SweepHull(points, deadline)
+    except SweepHullFailed:
+        hull = None
+    if hull is not None and hull.triangles:
+        return from_halfedges(hull.triangles, hull.halfedges, len(points))
+    mesh = QuadEdgeMesh(points)
+    ldo, rdo = mesh.triangulate(0, len(points))
+    onext, org, new_id = mesh.export()
+    ldo = 4 * new_id[ldo >> 2] + (ldo & 3)
+    rdo = 4 * new_id[rdo >> 2] + (rdo & 3)
+    return onext, org, ldo, rdo
+
+
+def _triangulate_shared_slab(points_name, lo, hi, mesh_name, deadline=None):
+    """Triangule la bande lo..hi-1 dans un worker, via la mémoire partagée.
+
+    Lit les coordonnées (float64) dans `points_name`, écrit `onext` puis
+    `org` (int64) dans `mesh_name` à partir de `2 * SLOTS_PER_POINT * lo` ;
+    retourne (nombre d'entrées, ldo, rdo).
+    """
+    points_shm = shared_memory.SharedMemory(name=points_name)
+    mesh_shm = shared_memory.SharedMemory(name=mesh_name)
+    try:
+        coords = points_shm.buf.cast("d")
+        flat = coords[2 * lo:2 * hi].tolist()
+        coords.release()
+        onext, org, ldo, rdo = _triangulate_slab(
+            list(zip(flat[::2], flat[1::2], strict=True)), deadline)
+        k = len(onext)
+        base = 2 * SLOTS_PER_POINT * lo
+        capacity = SLOTS_PER_POINT * (hi - lo)
+        if k > capacity:
+            raise RuntimeError("Too many edges for the shared buffer")
+        out = mesh_shm.buf.cast("q")
+        out[base:base + k] = array("q", onext)
+        out[base + capacity:base + capacity + k] = array("q", org)
+        out.release()
+        return k, ldo, rdo
+    finally:
+        points_shm.close()
+        mesh_shm.close()
+
+
+def _pool(workers):
+    """Retourne le pool persistant de `workers` processus (créé au besoin)."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(workers)
+        return pool
+
+
+def _triangulate_slabs(ordered, bounds, workers, deadline=None):
+    """Triangule les bandes dans le pool ; retourne leurs (onext, org, ldo, rdo)."""
+    n = len(ordered)
+    points_shm = shared_memory.SharedMemory(create=True, size=16 * n)
+    mesh_shm = shared_memory.SharedMemory(
+        create=True, size=8 * 2 * SLOTS_PER_POINT * n)
+    try:
+        coords = points_shm.buf.cast("d")
+        coords[:] = array("d", [c for p in ordered for c in p])
+        coords.release()
+        pool = _pool(workers)
+        try:
+            outcomes = list(pool.map(
+                _triangulate_shared_slab, repeat(points_shm.name),
+                bounds[:-1], bounds[1:], repeat(mesh_shm.name),
+                repeat(deadline)))
+        except BrokenProcessPool:
+            with _pools_lock:  # un worker est mort : nouveau pool au prochain appel
+                if _pools.get(workers) is pool:
+                    del _pools[workers]
+            raise
+        results = []
+        mesh = mesh_shm.buf.cast("q")
+        for lo, hi, (k, ldo, rdo) in zip(bounds[:-1], bounds[1:], outcomes,
+                                         strict=True):
+            base = 2 * SLOTS_PER_POINT * lo
+            capacity = SLOTS_PER_POINT * (hi - lo)
+            results.append((mesh[base:base + k].tolist(),
+                            mesh[base + capacity:base + capacity + k].tolist(),
+                            ldo, rdo))
+        mesh.release()
+        return results
+    finally:
+        for shm in (points_shm, mesh_shm):
+            shm.close()
+            shm.unlink()
+
+
+def divide_and_conquer(points, slabs=None, workers=None, deadline=None):
+    """Triangulation de Delaunay par division, bandes en parallèle.
+
+    `workers` processus (par défaut le nombre de cœurs, pool persistant)
+    triangulent `slabs` bandes (par défaut une par processus, d'au moins
+    `SLAB_MIN` points) ; avec un seul processus, tout est calculé sur place. Les
+    points doivent être distincts ; les triangles utilisent les indices
+    d'origine. `deadline` (une `Deadline`) est vérifiée par le balayage de
+    chaque bande, dans les workers, et avant chaque fusion.
+    """
+    points = points.tolist() if hasattr(points, "tolist") else list(points)
+    n = len(points)
+    workers = workers or os.cpu_count() or 1
+    if slabs is None:
+        slabs = min(workers, n // SLAB_MIN)
+    slabs = max(1, min(slabs, n // 2))
+
+    order = sorted(range(n), key=lambda i: (points[i][0], points[i][1]))
+    ordered = [tuple(points[i]) for i in order]
+    bounds = [n * s // slabs for s in range(slabs + 1)]
+
+    if workers > 1 and slabs > 1:
+        results = _triangulate_slabs(ordered, bounds, workers, deadline)
+    else:
+        results = [_triangulate_slab(ordered[lo:hi], deadline)
+                   for lo, hi in zip(bounds, bounds[1:], strict=False)]
+
+    # Fusion des bandes, de gauche à droite
+    mesh = QuadEdgeMesh(ordered)
+    ldo = rdo = None
+    for lo, (onext, org, s_ldo, s_rdo) in zip(bounds[:-1], results, strict=True):
+        offset = mesh.extend(onext, org, lo)
+        if ldo is None:
+            ldo, rdo = s_ldo + offset, s_rdo + offset
+        else:
+            if deadline is not None:
+                deadline.check()
+            ldo, rdo = mesh.merge(ldo, rdo, s_ldo + offset, s_rdo + offset)
+
+    return [(order[a], order[b], order[c]) for a, b, c in mesh.triangles(rdo)]
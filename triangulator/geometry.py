@@ -1,36 +1,133 @@
 """Utile pour la triangulation."""
 import math
+from fractions import Fraction
 
+# Prédicats adaptatifs (d'après Shewchuk) : le calcul flottant est accepté
+# quand il dépasse sa borne d'erreur, sinon on recalcule en exact.
+EPSILON = 2.0 ** -53  # erreur d'arrondi relative d'un float64
+CCW_ERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+ICC_ERRBOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+# Marge (relative à r²) du test sur un cercle circonscrit mis en cache
+CIRCLE_ERRBOUND = 64.0 * EPSILON
 
-def circumcircle(p1, p2, p3):
-    """Retourne (xc, yc, r) le cercle circonscrit au triangle (p1, p2, p3)."""
-    (x1, y1), (x2, y2), (x3, y3) = p1, p2, p3
 
-    d = 2 * (x1 * (y2 - y3) +
-             x2 * (y3 - y1) +
-             x3 * (y1 - y2))
+def _orient2d_exact(pa, pb, pc):
+    """orient2d en arithmétique exacte (fractions)."""
+    ax, ay = Fraction(pa[0]), Fraction(pa[1])
+    return ((ax - Fraction(pc[0])) * (Fraction(pb[1]) - Fraction(pc[1])) -
+            (ay - Fraction(pc[1])) * (Fraction(pb[0]) - Fraction(pc[0])))
+
+
+def orient2d(pa, pb, pc):
+    """Retourne un nombre > 0 si (pa, pb, pc) tourne dans le sens trigonométrique.
+
+    < 0 dans le sens horaire, 0 si les points sont alignés. Le signe est
+    toujours exact.
+    """
+    detleft = (pa[0] - pc[0]) * (pb[1] - pc[1])
+    detright = (pa[1] - pc[1]) * (pb[0] - pc[0])
+    det = detleft - detright
+    errbound = CCW_ERRBOUND * (abs(detleft) + abs(detright))
+    if det > errbound or -det > errbound:
+        return det
+    return _orient2d_exact(pa, pb, pc)
+
+
+def _incircle_exact(pa, pb, pc, pd):
+    """Incircle en arithmétique exacte (fractions)."""
+    dx, dy = Fraction(pd[0]), Fraction(pd[1])
+    adx, ady = Fraction(pa[0]) - dx, Fraction(pa[1]) - dy
+    bdx, bdy = Fraction(pb[0]) - dx, Fraction(pb[1]) - dy
+    cdx, cdy = Fraction(pc[0]) - dx, Fraction(pc[1]) - dy
+    return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+            (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+            (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def incircle(pa, pb, pc, pd):
+    """Retourne un nombre > 0 si pd est dans le cercle de (pa, pb, pc).
+
+    (pa, pb, pc) doit être dans le sens trigonométrique ; < 0 si pd est à
+    l'extérieur, 0 s'il est sur le cercle. Le signe est toujours exact.
+    """
+    adx, ady = pa[0] - pd[0], pa[1] - pd[1]
+    bdx, bdy = pb[0] - pd[0], pb[1] - pd[1]
+    cdx, cdy = pc[0] - pd[0], pc[1] - pd[1]
+
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+
+    det = (alift * (bdxcdy - cdxbdy) +
+           blift * (cdxady - adxcdy) +
+           clift * (adxbdy - bdxady))
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift +
+                 (abs(cdxady) + abs(adxcdy)) * blift +
+                 (abs(adxbdy) + abs(bdxady)) * clift)
+    errbound = ICC_ERRBOUND * permanent
+    if det > errbound or -det > errbound:
+        return det
+    return _incircle_exact(pa, pb, pc, pd)
+
+
+def circumcircle_sq(p1, p2, p3):
+    """Retourne (xc, yc, r²) le cercle circonscrit au triangle (p1, p2, p3)."""
+    c = circumcircle_bounded(p1, p2, p3)
+    return None if c is None else c[:3]
+
+
+def circumcircle_bounded(p1, p2, p3):
+    """Retourne (xc, yc, r², err) avec une borne d'erreur sur le test du cercle.
+
+    Pour un point p, si |p - (xc, yc)|² - r² dépasse err en valeur absolue,
+    le signe de la différence est fiable ; sinon il faut utiliser `incircle`.
+    Le calcul se fait relativement à p1 pour limiter les arrondis.
+    """
+    x1, y1 = p1
+    bx, by = p2[0] - x1, p2[1] - y1
+    cx, cy = p3[0] - x1, p3[1] - y1
+
+    d = 2 * (bx * cy - by * cx)
 
     if d == 0:
         return None  # points alignés
 
-    ux = (
-                 (x1 ** 2 + y1 ** 2) * (y2 - y3) +
-                 (x2 ** 2 + y2 ** 2) * (y3 - y1) +
-                 (x3 ** 2 + y3 ** 2) * (y1 - y2)
-         ) / d
+    b2 = bx * bx + by * by
+    c2 = cx * cx + cy * cy
+    ux = (cy * b2 - by * c2) / d
+    uy = (bx * c2 - cx * b2) / d
+    r2 = ux * ux + uy * uy
 
-    uy = (
-                 (x1 ** 2 + y1 ** 2) * (x3 - x2) +
-                 (x2 ** 2 + y2 ** 2) * (x1 - x3) +
-                 (x3 ** 2 + y3 ** 2) * (x2 - x1)
-         ) / d
+    # L'erreur croît quand le triangle est aplati (l² / |d|) et quand le
+    # centre est loin de l'origine par rapport au rayon.
+    l2 = max(b2, c2, (bx - cx) ** 2 + (by - cy) ** 2)
+    xc, yc = x1 + ux, y1 + uy
+    err = CIRCLE_ERRBOUND * r2 * (
+        1.0 + l2 / abs(d) + (abs(xc) + abs(yc)) / math.sqrt(r2))
+    return xc, yc, r2, err
 
-    r = math.dist((ux, uy), (x1, y1))
 
-    return ux, uy, r
+def circumcircle(p1, p2, p3):
+    """Retourne (xc, yc, r) le cercle circonscrit au triangle (p1, p2, p3)."""
+    c = circumcircle_sq(p1, p2, p3)
+    if c is None:
+        return None  # points alignés
+    ux, uy, r2 = c
+    return ux, uy, math.sqrt(r2)
 
 
 def point_in_circumcircle(p, circle):
     """Point_in_circumcircle."""
     xc, yc, r = circle
     return math.dist((xc, yc), p) <= r
+
+
+def point_in_circumcircle_sq(p, circle):
+    """Comme point_in_circumcircle, sans racine carrée (circle = (xc, yc, r²))."""
+    xc, yc, r2 = circle
+    dx = p[0] - xc
+    dy = p[1] - yc
+    return dx * dx + dy * dy <= r2
@@ -0,0 +1,229 @@
+"""Triangulation incrémentale : ajout de points sans tout recalculer.
+
+Le maillage (`TriangleMesh`) est gardé entre les appels : chaque nouveau
+point ne modifie que sa cavité. L'état peut être sauvegardé (`dumps`) puis
+repris (`loads`) sans aucun calcul géométrique.
+"""
+import math
+import struct
+
+from triangulator.delaunay import TriangleMesh
+from triangulator.ordering import brio_order
+from triangulator.triangulator import Triangulator
+from triangulator.validation import InvalidPointSet
+
+# En-tête de l'état sauvegardé : points, cases de triangles, cases libres,
+# dernier triangle créé
+_STATE_HEADER = struct.Struct("!IIIi")
+
+
+def _first_indices(points):
+    """Retourne {(x, y): indice de la première occurrence}."""
+    index = {}
+    for i, p in enumerate(points):
+        index.setdefault(p, i)
+    return index
+
+
+class IncrementalTriangulation:
+    """Triangulation de Delaunay qui grandit point par point.
+
+    Les triangles sont ceux de `bowyer_watson` sur l'ensemble des points
+    insérés ; les indices sont ceux de l'ordre d'insertion. Un point déjà
+    présent n'est pas inséré une seconde fois. Une triangulation reprise
+    garde tous les points du PointSet : un doublon reste un sommet inerte,
+    hors des triangles, comme dans la sortie du `Triangulator`.
+    """
+
+    def __init__(self, points=()):
+        """Triangule `points` (liste de (x, y) ou tableau NumPy (N, 2))."""
+        self.mesh = TriangleMesh([])
+        self._index = {}  # (x, y) -> indice du point
+        self.insert_points(points)
+
+    def __len__(self):
+        """Nombre de points."""
+        return len(self.mesh.points) - 3
+
+    @property
+    def points(self):
+        """Points de la triangulation (liste de (x, y))."""
+        return self.mesh.points[3:]
+
+    @classmethod
+    def _stored(cls, points):
+        """Retourne une triangulation vide qui garde `points` (sans insertion)."""
+        result = cls()
+        result.mesh.points.extend(points)
+        result._index = _first_indices(points)
+        return result
+
+    @classmethod
+    def _recompute(cls, points):
+        """Triangule `points` en gardant leurs indices, doublons compris."""
+        result = cls._stored(points)
+        first = sorted(result._index.values())
+        for i in brio_order([points[j] for j in first]):
+            result.mesh.insert(first[i] + 3)
+        return result
+
+    @classmethod
+    def from_triangulation(cls, points, triangles):
+        """Reprend une triangulation de Delaunay déjà calculée.
+
+        Seuls les sommets de l'enveloppe sont insérés (pour relier le
+        maillage au super triangle), puis les triangles donnés sont repris
+        tels quels et les arêtes de l'enveloppe légalisées. Si leur bord
+        n'est pas l'enveloppe convexe, tout est recalculé. Les doublons
+        sont gardés (inertes) ; un triangle qui en utilise un est ramené à
+        la première occurrence du point.
+        """
+        if hasattr(points, "tolist"):
+            points = points.tolist()
+        points = [tuple(p) for p in points]
+        result = cls._stored(points)
+        mesh = result.mesh
+        first = [result._index[p] + 3 for p in points]
+
+        triangles = [(first[a], first[b], first[c]) for a, b, c in triangles]
+        edges = {}  # arête orientée -> (triangle donné, sommet opposé)
+        for j, (a, b, c) in enumerate(triangles):
+            edges[a, b], edges[b, c], edges[c, a] = (j, 2), (j, 0), (j, 1)
+        hull = [e for e in edges if e[::-1] not in edges]
+        if not hull:
+            return cls._recompute(points)
+        ring = {a for a, _ in hull}
+
+        # Maillage des seuls sommets de l'enveloppe
+        order = sorted(ring)
+        for i in brio_order([mesh.points[i] for i in order]):
+            mesh.insert(order[i])
+        v, nb = mesh.vertices, mesh.neighbours
+        inner = [t for t in range(len(v) // 3) if min(v[3 * t:3 * t + 3]) >= 3]
+        inner_set = set(inner)
+        outer = {}  # arête orientée -> (triangle extérieur, case)
+        for t in range(len(v) // 3):
+            if v[3 * t] >= 0 and t not in inner_set:
+                for k in range(3):
+                    outer[v[3 * t + (k + 1) % 3], v[3 * t + (k + 2) % 3]] = \
+                        (t, 3 * t + k)
+        if any(e[::-1] not in outer for e in hull):
+            # Bord non convexe (ou triangulation incomplète) : on recalcule
+            return cls._recompute(points)
+
+        # Remplacement de l'intérieur par les triangles donnés
+        slots = inner + [mesh._new_triangle()
+                         for _ in range(len(triangles) - len(inner))]
+        for j, (a, b, c) in enumerate(triangles):
+            t = slots[j]
+            v[3 * t:3 * t + 3] = (a, b, c)
+            mesh.circles[t] = None
+            for k, (x, y) in enumerate(((b, c), (c, a), (a, b))):
+                if (y, x) in edges:
+                    n, _ = edges[y, x]
+                    nb[3 * t + k] = slots[n]
+                else:
+                    n, slot = outer[y, x]
+                    nb[3 * t + k] = n
+                    nb[slot] = t
+        for t in slots:
+            a, b, c = v[3 * t:3 * t + 3]
+            mesh.circles[t] = mesh.circle(a, b, c)
+        mesh.last = slots[0]
+
+        # Les triangles extérieurs ne voyaient pas les points intérieurs
+        mesh.legalize([(slots[edges[a, b][0]], a, b) for a, b in hull])
+        return result
+
+    @classmethod
+    def from_binary(cls, binary):
+        """Reprend un binaire au format `Triangles` de la spec."""
+        (n,) = struct.unpack_from("!I", binary)
+        split = 4 + 8 * n
+        points = Triangulator(None, use_numpy=False) \
+            .deserialize_pointset(binary[:split])
+        (t,) = struct.unpack_from("!I", binary, split)
+        flat = struct.unpack_from(f"!{3 * t}I", binary, split + 4)
+        triangles = [flat[j:j + 3] for j in range(0, 3 * t, 3)]
+        return cls.from_triangulation(points, triangles)
+
+    def insert_points(self, new_points):
+        """Ajoute des points ; retourne leurs indices (dans l'ordre donné).
+
+        Seules les cavités des nouveaux points sont retriangulées ; ils
+        sont insérés dans l'ordre BRIO pour garder les marches courtes.
+        """
+        if hasattr(new_points, "tolist"):
+            new_points = new_points.tolist()
+        new_points = [(float(x), float(y)) for x, y in new_points]
+        if not all(math.isfinite(x) and math.isfinite(y)
+                   for x, y in new_points):
+            raise InvalidPointSet(
+                "PointSet contains NaN or infinite coordinates")
+
+        mesh = self.mesh
+        indices, added = [], []
+        for p in new_points:
+            if p not in self._index:
+                self._index[p] = len(mesh.points) - 3
+                mesh.points.append(p)
+                added.append(p)
+            indices.append(self._index[p])
+
+        first = len(mesh.points) - len(added)
+        for i in brio_order(added):
+            mesh.insert(first + i)
+        return indices
+
+    def triangles(self):
+        """Retourne les triangles (indices des points), comme `bowyer_watson`."""
+        return [(a - 3, b - 3, c - 3) for (a, b, c) in self.mesh.triangles()
+                if a >= 3 and b >= 3 and c >= 3]
+
+    def to_binary(self):
+        """Retourne la triangulation au format `Triangles` de la spec."""
+        binary, _ = Triangulator(None, use_numpy=False).serialize_triangulation(
+            self.points, self.triangles())
+        return binary
+
+    def dumps(self):
+        """Sauvegarde l'état du maillage (octets).
+
+        Les cercles circonscrits ne sont pas stockés : ils sont recalculés
+        au chargement.
+        """
+        mesh = self.mesh
+        n = len(mesh.points) - 3
+        slots = len(mesh.vertices)
+        return b"".join((
+            _STATE_HEADER.pack(n, slots, len(mesh.free), mesh.last),
+            struct.pack(f"!{2 * n}d", *(c for p in mesh.points[3:] for c in p)),
+            struct.pack(f"!{slots}i", *mesh.vertices),
+            struct.pack(f"!{slots}i", *mesh.neighbours),
+            struct.pack(f"!{len(mesh.free)}i", *mesh.free),
+        ))
+
+    @classmethod
+    def loads(cls, data):
+        """Reprend un état sauvegardé par `dumps`."""
+        n, slots, free, last = _STATE_HEADER.unpack_from(data)
+        offset = _STATE_HEADER.size
+        coords = struct.unpack_from(f"!{2 * n}d", data, offset)
+        offset += 16 * n
+        vertices = struct.unpack_from(f"!{slots}i", data, offset)
+        offset += 4 * slots
+        neighbours = struct.unpack_from(f"!{slots}i", data, offset)
+        offset += 4 * slots
+
+        result = cls()
+        mesh = result.mesh
+        mesh.points.extend(zip(coords[::2], coords[1::2], strict=True))
+        mesh.vertices = list(vertices)
+        mesh.neighbours = list(neighbours)
+        mesh.free = list(struct.unpack_from(f"!{free}i", data, offset))
+        mesh.last = last
+        mesh.circles = [None if a < 0 else mesh.circle(a, b, c)
+                        for a, b, c in zip(vertices[::3], vertices[1::3],
+                                           vertices[2::3], strict=True)]
+        result._index = _first_indices(mesh.points[3:])
+        return result
@@ -0,0 +1,127 @@
+"""Lecture de PointSets volumineux sans les charger en mémoire.
+
+Le binaire (format `PointSet` de la spec) est projeté en mémoire (`mmap`) :
+les coordonnées sont une vue NumPy float32 (big-endian) sur le fichier,
+aucun objet Python n'est créé par point. Un flux est d'abord recopié par
+morceaux dans un fichier temporaire, puis projeté de la même façon.
+"""
+import mmap
+import os
+import struct
+import tempfile
+
+from triangulator.triangulator import InvalidPointSetBinary, Triangulator
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est requis pour la vue sur les coordonnées
+    np = None
+
+CHUNK_SIZE = 1024 * 1024  # taille des morceaux lus dans un flux
+
+
+class MappedPointSet:
+    """PointSet projeté en mémoire.
+
+    `binary` est la projection complète (utilisable par
+    `Triangulator.triangulate_binary`) et `points` une vue (N, 2) en
+    lecture seule sur les coordonnées. Les vues doivent être libérées avant
+    `close` (ou la sortie du bloc `with`).
+    """
+
+    def __init__(self, binary, file=None):
+        """Init ; vérifie l'en-tête par rapport à la taille."""
+        if np is None:
+            raise ValueError("Memory-mapped PointSets require NumPy")
+        self.binary = binary
+        self._file = file
+        n = Triangulator.read_header(binary)
+        self.points = np.frombuffer(binary, dtype=">f4", count=2 * n,
+                                    offset=4).reshape(n, 2)
+
+    def __len__(self):
+        """Nombre de points."""
+        return len(self.points)
+
+    def __enter__(self):
+        """Context manager."""
+        return self
+
+    def __exit__(self, *exc):
+        """Libère la projection à la sortie du bloc."""
+        self.close()
+
+    def close(self):
+        """Libère la projection et le fichier."""
+        self.points = None
+        if isinstance(self.binary, mmap.mmap):
+            self.binary.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _map_file(file):
+    """Projette un fichier ouvert en lecture ; le ferme en cas d'erreur."""
+    try:
+        if os.fstat(file.fileno()).st_size < 4:
+            raise InvalidPointSetBinary("Binary too short: cannot read N")
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return MappedPointSet(mapping, file)
+        except BaseException:
+            mapping.close()
+            raise
+    except BaseException:
+        file.close()
+        raise
+
+
+def open_pointset(path):
+    """Projette le fichier PointSet `path` ; retourne un `MappedPointSet`."""
+    return _map_file(open(path, "rb"))  # noqa: SIM115 (fermé par close)
+
+
+def map_pointset(buffer):
+    """Retourne un `MappedPointSet` sur un `mmap` (ou tout tampon) existant.
+
+    La projection n'est pas fermée par `close` si elle n'est pas un `mmap`.
+    """
+    return MappedPointSet(buffer)
+
+
+def spool_pointset(stream, chunk_size=CHUNK_SIZE, directory=None):
+    """Recopie un flux PointSet dans un fichier temporaire et le projette.
+
+    L'en-tête est lu en premier : seuls 4 + 8N octets sont recopiés, par
+    morceaux de `chunk_size`, et un flux trop court ou trop long est
+    refusé. Le fichier temporaire (dans `directory`, ou le dossier
+    temporaire du système) disparaît à la fermeture.
+    """
+    header = stream.read(4)
+    if len(header) < 4:
+        raise InvalidPointSetBinary("Binary too short: cannot read N")
+    n = struct.unpack("!I", header)[0]
+    expected = 4 + 8 * n
+
+    file = tempfile.TemporaryFile(dir=directory)  # noqa: SIM115
+    try:
+        file.write(header)
+        chunk = bytearray(chunk_size)
+        remaining = expected - 4
+        while remaining:
+            view = memoryview(chunk)[:min(chunk_size, remaining)]
+            read = stream.readinto(view)
+            if not read:
+                raise InvalidPointSetBinary(
+                    f"Inconsistent size: expected {expected} bytes,"
+                    f" got {expected - remaining}")
+            file.write(view[:read])
+            remaining -= read
+        if stream.read(1):
+            raise InvalidPointSetBinary(
+                f"Inconsistent size: expected {expected} bytes, got more")
+        file.flush()
+    except BaseException:
+        file.close()
+        raise
+    return _map_file(file)
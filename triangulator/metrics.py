@@ -0,0 +1,132 @@
+"""Métriques du Triangulator : histogrammes et export Prometheus.
+
+Un objet `Metrics` s'utilise comme observateur d'un `Triangulator`
+(`Triangulator(manager, observer=metrics)`) ; `render` produit le format
+texte de Prometheus, servi par le service sur /metrics.
+"""
+import threading
+from bisect import bisect_left
+
+# Bornes des histogrammes
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                10.0, 30.0, 60.0)
+COUNT_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000,
+                 100_000_000, 1_000_000_000)
+
+# Événement -> (nom de la métrique, étiquettes, bornes)
+_HISTOGRAMS = {
+    "fetch_seconds": ("triangulator_phase_seconds", {"phase": "fetch"},
+                      TIME_BUCKETS),
+    "deserialize_seconds": ("triangulator_phase_seconds",
+                            {"phase": "deserialize"}, TIME_BUCKETS),
+    "validate_seconds": ("triangulator_phase_seconds", {"phase": "validate"},
+                         TIME_BUCKETS),
+    "triangulate_seconds": ("triangulator_phase_seconds",
+                            {"phase": "triangulate"}, TIME_BUCKETS),
+    "serialize_seconds": ("triangulator_phase_seconds",
+                          {"phase": "serialize"}, TIME_BUCKETS),
+    "points": ("triangulator_points", {}, COUNT_BUCKETS),
+    "triangles": ("triangulator_triangles", {}, COUNT_BUCKETS),
+    "payload_in_bytes": ("triangulator_payload_bytes", {"direction": "in"},
+                         BYTES_BUCKETS),
+    "payload_out_bytes": ("triangulator_payload_bytes", {"direction": "out"},
+                          BYTES_BUCKETS),
+}
+
+_HELP = {
+    "triangulator_phase_seconds": "Duration of each triangulation phase.",
+    "triangulator_points": "Number of points per PointSet.",
+    "triangulator_triangles": "Number of triangles per triangulation.",
+    "triangulator_payload_bytes": "Size of PointSet and Triangles payloads.",
+    "triangulator_results_total": "Triangulation results by status.",
+}
+
+
+def _labels(labels, **extra):
+    """Retourne les étiquettes au format Prometheus ({a="1",b="2"})."""
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Histogram:
+    """Histogramme à bornes fixes (comptes par tranche, somme, total)."""
+
+    def __init__(self, buckets):
+        """Init."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # dernière : +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Ajoute une valeur (l'appelant tient le verrou)."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Retourne les comptes cumulés par borne, +Inf compris."""
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class Metrics:
+    """Agrégation des mesures d'un ou plusieurs `Triangulator`.
+
+    S'appelle comme un observateur : metrics(événement, valeur). Les
+    événements inconnus sont ignorés.
+    """
+
+    def __init__(self):
+        """Init."""
+        self.histograms = {}  # (nom, étiquettes) -> Histogram
+        self.results = {}  # statut -> nombre
+        self._lock = threading.Lock()
+
+    def __call__(self, event, value):
+        """Enregistre une mesure."""
+        if event == "status":
+            with self._lock:
+                self.results[value] = self.results.get(value, 0) + 1
+            return
+        spec = _HISTOGRAMS.get(event)
+        if spec is None:
+            return
+        name, labels, buckets = spec
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self):
+        """Retourne les métriques au format texte de Prometheus (0.0.4)."""
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                by_name.setdefault(name, []).append((dict(labels), histogram))
+            for name, series in by_name.items():
+                lines.append(f"# HELP {name} {_HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, h in series:
+                    bounds = [*(repr(float(b)) for b in h.buckets), "+Inf"]
+                    for le, count in zip(bounds, h.cumulative(), strict=True):
+                        lines.append(f"{name}_bucket{_labels(labels, le=le)} "
+                                     f"{count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {h.sum!r}")
+                    lines.append(f"{name}_count{_labels(labels)} {h.count}")
+            if self.results:
+                name = "triangulator_results_total"
+                lines.append(f"# HELP {name} {_HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for status, count in sorted(self.results.items()):
+                    lines.append(f'{name}{{status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+"""Ordre d'insertion des points (BRIO + courbe de Hilbert)."""
+import random
+
+HILBERT_ORDER = 16  # grille de 2^16 x 2^16 cases
+
+
+def hilbert_index(x, y, order=HILBERT_ORDER):
+    """Retourne la position de la case (x, y) le long de la courbe de Hilbert."""
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotation du quadrant
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def hilbert_keys(points, order=HILBERT_ORDER):
+    """Clés de Hilbert des points, après mise à l'échelle sur leur boîte."""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    x_min, y_min = min(xs), min(ys)
+    span = max(max(xs) - x_min, max(ys) - y_min) or 1.0
+    scale = ((1 << order) - 1) / span
+    return [hilbert_index(int((x - x_min) * scale), int((y - y_min) * scale),
+                          order)
+            for x, y in zip(xs, ys, strict=True)]
+
+
+def brio_order(points, seed=0):
+    """Ordre d'insertion BRIO (Biased Randomized Insertion Order).
+
+    Les indices sont mélangés puis répartis en tours de taille doublant
+    (le dernier tour contient la moitié des points) ; chaque tour est trié
+    le long de la courbe de Hilbert. Retourne une permutation des indices
+    de `points`.
+    """
+    n = len(points)
+    if n == 0:
+        return []
+    keys = hilbert_keys(points)
+    indices = list(range(n))
+    random.Random(seed).shuffle(indices)
+
+    # Bornes des tours : ..., n/8, n/4, n/2, n
+    bounds = [n]
+    while bounds[-1] > 64:
+        bounds.append(bounds[-1] // 2)
+    bounds.append(0)
+    bounds.reverse()
+
+    order = []
+    for lo, hi in zip(bounds, bounds[1:], strict=False):
+        order.extend(sorted(indices[lo:hi], key=keys.__getitem__))
+    return order
@@ -0,0 +1,121 @@
+"""Triangulation dans un pool de processus, échanges par mémoire partagée.
+
+Les moteurs en Python pur gardent le GIL : un pool de processus permet
+d'utiliser plusieurs cœurs. Les coordonnées et les triangles passent par
+`multiprocessing.shared_memory` au lieu d'être sérialisés par pickle.
+"""
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from triangulator.triangulator import Triangulator
+
+
+def _triangulate_shared(engine, points_name, n, triangles_name, capacity,
+                        deadline=None):
+    """Triangule dans un worker ; retourne le nombre de triangles écrits."""
+    points_shm = shared_memory.SharedMemory(name=points_name)
+    triangles_shm = shared_memory.SharedMemory(name=triangles_name)
+    try:
+        coords = points_shm.buf.cast("d")
+        flat = coords[:2 * n].tolist()
+        coords.release()
+        options = {} if deadline is None else {"deadline": deadline}
+        triangles = Triangulator.get_engine(engine)(
+            list(zip(flat[::2], flat[1::2], strict=True)), **options)
+        if hasattr(triangles, "tolist"):
+            triangles = triangles.tolist()
+        t = len(triangles)
+        if t > capacity:
+            raise RuntimeError("Too many triangles for the shared buffer")
+        out = triangles_shm.buf.cast("I")
+        out[:3 * t] = array("I", [v for tri in triangles for v in tri])
+        out.release()
+        return t
+    finally:
+        points_shm.close()
+        triangles_shm.close()
+
+
+class SharedMemoryPool:
+    """Pool de processus persistant pour `Triangulator(executor=...)`.
+
+    Chaque appel copie les points (float64) dans un segment de mémoire
+    partagée ; le worker y lit les points et écrit les triangles (uint32)
+    dans un second segment, dimensionné pour 2n triangles (une
+    triangulation de n points en a au plus 2n - 5). Les segments sont
+    libérés à la fin de l'appel. Les échanges passent par `array` et
+    `memoryview` : NumPy n'est pas nécessaire.
+
+    Si un worker meurt (manque de mémoire, plantage), le pool est
+    recréé et l'appel refait une fois.
+    """
+
+    def __init__(self, max_workers=None, mp_context=None):
+        """Init."""
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+        self._pool = ProcessPoolExecutor(max_workers, mp_context=mp_context)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        """Context manager."""
+        return self
+
+    def __exit__(self, *exc):
+        """Arrête les workers à la sortie du bloc."""
+        self.close()
+
+    def _rebuild(self, broken):
+        """Remplace le pool `broken` (sauf si un autre appel l'a déjà fait)."""
+        with self._lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(self.max_workers,
+                                                 mp_context=self.mp_context)
+
+    def _submit(self, *args):
+        """Exécute `_triangulate_shared` ; refait l'appel si le pool a cassé."""
+        for attempt in range(2):
+            pool = self._pool
+            try:
+                return pool.submit(_triangulate_shared, *args).result()
+            except BrokenProcessPool:
+                self._rebuild(pool)
+                if attempt:
+                    raise
+
+    def triangulate(self, points, engine="bowyer_watson", deadline=None):
+        """Triangule `points` avec le moteur `engine` dans un worker.
+
+        Retourne la liste des triangles (a, b, c), indices dans `points`.
+        `deadline` (une `Deadline`) est envoyée au worker.
+        """
+        Triangulator.get_engine(engine)
+        if hasattr(points, "tolist"):
+            points = points.tolist()
+        n = len(points)
+        capacity = max(2 * n, 1)
+        points_shm = shared_memory.SharedMemory(create=True, size=16 * max(n, 1))
+        triangles_shm = shared_memory.SharedMemory(create=True,
+                                                   size=12 * capacity)
+        try:
+            coords = points_shm.buf.cast("d")
+            coords[:2 * n] = array("d", [c for p in points for c in p])
+            coords.release()
+            t = self._submit(engine, points_shm.name, n, triangles_shm.name,
+                             capacity, deadline)
+            out = triangles_shm.buf.cast("I")
+            flat = out[:3 * t].tolist()
+            out.release()
+            return list(zip(flat[::3], flat[1::3], flat[2::3], strict=True))
+        finally:
+            for shm in (points_shm, triangles_shm):
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        """Arrête les workers."""
+        self._pool.shutdown()
@@ -0,0 +1,152 @@
+"""Admission des triangulations selon leur taille (plus court d'abord).
+
+L'en-tête du PointSet donne N avant tout calcul : on en déduit le coût
+(`estimate_seconds`) et la mémoire (`estimate_bytes`) de la triangulation.
+Les calculs en attente passent par ordre de coût croissant, avec un
+vieillissement qui empêche la famine des gros PointSets, dans la limite de
+`slots` calculs simultanés et d'un budget mémoire global.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from triangulator.deadline import DeadlineExceeded, estimate_seconds
+
+# Pic mémoire de `Triangulator.triangulate_binary` par point (octets),
+# mesuré avec tracemalloc (points uniformes, arrondi au-dessus)
+BYTES_PER_POINT = {
+    "bowyer_watson": 1200,
+    "sweep_hull": 600,
+    "divide_conquer": 2000,
+    "numpy": 600,
+}
+
+
+def estimate_bytes(n, engine):
+    """Retourne une estimation de la mémoire nécessaire pour trianguler n points."""
+    return BYTES_PER_POINT[engine] * n
+
+
+class AdmissionRejected(Exception):
+    """Triangulation refusée par l'ordonnanceur (mémoire, file pleine)."""
+
+    def __init__(self, message):
+        """Init."""
+        super().__init__(message)
+        self.message = message
+
+
+class _Job:
+    """Calcul en attente d'admission."""
+
+    __slots__ = ("cost", "memory", "enqueued", "admitted")
+
+    def __init__(self, cost, memory, enqueued):
+        """Init."""
+        self.cost = cost
+        self.memory = memory
+        self.enqueued = enqueued
+        self.admitted = False
+
+
+class Scheduler:
+    """Ordonnanceur "plus court d'abord" devant les calculs de triangulation.
+
+    - au plus `slots` calculs à la fois ;
+    - `memory_budget` (octets, optionnel) : la somme des estimations des
+      calculs en cours ne le dépasse pas ; un calcul qui ne tiendrait pas
+      seul est refusé ;
+    - `max_waiting` (optionnel) : au-delà, les nouveaux calculs sont
+      refusés ;
+    - priorité : coût estimé (secondes) moins `aging` fois l'attente
+      (secondes) ; un gros calcul finit donc par passer devant les petits
+      qui arrivent. Le premier de la file qui ne tient pas dans la mémoire
+      restante bloque les suivants (la mémoire lui est réservée).
+    """
+
+    def __init__(self, slots=1, memory_budget=None, max_waiting=None,
+                 aging=1.0, clock=time.monotonic):
+        """Init."""
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+        self.slots = slots
+        self.memory_budget = memory_budget
+        self.max_waiting = max_waiting
+        self.aging = aging
+        self.clock = clock
+        self.running = 0
+        self.memory_used = 0
+        self.rejected = 0
+        self._waiting = []
+        self._cond = threading.Condition()
+
+    def waiting(self):
+        """Nombre de calculs en attente."""
+        with self._cond:
+            return len(self._waiting)
+
+    def _priority(self, job, now):
+        """Priorité d'un calcul (la plus petite passe en premier)."""
+        return job.cost - self.aging * (now - job.enqueued)
+
+    def _dispatch(self):
+        """Admet les calculs en tête de file (l'appelant tient le verrou)."""
+        now = self.clock()
+        admitted = False
+        for job in sorted(self._waiting,
+                          key=lambda j: self._priority(j, now)):
+            if self.running >= self.slots:
+                break
+            if self.memory_budget is not None and \
+                    self.memory_used + job.memory > self.memory_budget:
+                break
+            self._waiting.remove(job)
+            job.admitted = True
+            self.running += 1
+            self.memory_used += job.memory
+            admitted = True
+        if admitted:
+            self._cond.notify_all()
+
+    def _reject(self, message):
+        """Refuse un calcul (l'appelant tient le verrou)."""
+        self.rejected += 1
+        raise AdmissionRejected(message)
+
+    @contextmanager
+    def admit(self, n, engine, deadline=None):
+        """Attend l'admission du calcul de n points avec `engine`.
+
+        Lève `AdmissionRejected` (mémoire insuffisante, file pleine) ou
+        `DeadlineExceeded` si `deadline` (une `Deadline`) ne laisse pas le
+        temps estimé du calcul, avant ou pendant l'attente.
+        """
+        cost, memory = estimate_seconds(n, engine), estimate_bytes(n, engine)
+        with self._cond:
+            if self.memory_budget is not None and memory > self.memory_budget:
+                self._reject(f"{n} points need about {memory} bytes, "
+                             f"over the {self.memory_budget} bytes budget")
+            if self.max_waiting is not None and \
+                    len(self._waiting) >= self.max_waiting:
+                self._reject("too many triangulations waiting")
+            job = _Job(cost, memory, self.clock())
+            self._waiting.append(job)
+            self._dispatch()
+            while not job.admitted:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline.remaining() - cost
+                    if remaining <= 0:
+                        self._waiting.remove(job)
+                        self._dispatch()
+                        raise DeadlineExceeded(
+                            f"{n} points cannot be triangulated in time")
+                # Les admissions se font à chaque fin de calcul (`_dispatch`)
+                self._cond.wait(remaining)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.running -= 1
+                self.memory_used -= memory
+                self._dispatch()
@@ -0,0 +1,219 @@
+"""Service HTTP du Triangulator (API décrite dans TP/triangulator.yml).
+
+Lancement : python -m triangulator.service --manager-url http://hote:port
+(ou --manager module:attribut ; voir `main` pour les threads et processus).
+"""
+import argparse
+import base64
+import importlib
+import json
+import math
+
+from flask import Flask, Response, jsonify, request
+
+from triangulator.breaker import CircuitBreaker
+from triangulator.client import PointSetManagerClient
+from triangulator.coalescing import CoalescingTriangulator
+from triangulator.metrics import Metrics
+from triangulator.process_pool import SharedMemoryPool
+from triangulator.scheduler import Scheduler
+from triangulator.triangulator import Triangulator
+
+CHUNK_SIZE = 64 * 1024  # taille des morceaux envoyés au client
+
+# Statut HTTP -> code d'erreur du schéma `Error`
+ERROR_CODES = {
+    400: "BAD_REQUEST",
+    404: "POINTSET_NOT_FOUND",
+    500: "TRIANGULATION_FAILED",
+    503: "SERVICE_UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+
+
+def stream_binary(view, chunk_size=CHUNK_SIZE):
+    """Envoie un binaire par morceaux, sans en faire de copie complète."""
+    for offset in range(0, len(view), chunk_size):
+        yield bytes(view[offset:offset + chunk_size])
+
+
+def error_response(status, message, retry_after=None):
+    """Réponse JSON conforme au schéma `Error` de la spec.
+
+    `retry_after` (secondes) ajoute l'en-tête Retry-After, arrondi à la
+    seconde supérieure.
+    """
+    response = jsonify({"code": ERROR_CODES.get(status, "ERROR"),
+                        "message": message})
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def to_response(result):
+    """Convertit un dict de statut de `Triangulator.triangulate` en réponse."""
+    status = result["status"]
+    if status != 200:
+        return error_response(status, result.get("error", ""),
+                              result.get("retry_after"))
+
+    view = result["Triangulation"]
+    return Response(stream_binary(view), status=200,
+                    mimetype="application/octet-stream",
+                    headers={"Content-Length": str(view.nbytes)})
+
+
+def batch_line(pointset_id, result):
+    """Ligne NDJSON du résultat d'un PointSet dans une réponse par lot.
+
+    Succès : le binaire `Triangles` est encodé en base64 ; erreur : mêmes
+    champs que le schéma `Error`.
+    """
+    status = result["status"]
+    line = {"pointSetId": pointset_id, "status": status}
+    if status == 200:
+        line["triangulation"] = base64.b64encode(
+            result["Triangulation"]).decode("ascii")
+    else:
+        line["code"] = ERROR_CODES.get(status, "ERROR")
+        line["message"] = result.get("error", "")
+        if "retry_after" in result:
+            line["retryAfter"] = result["retry_after"]
+    return json.dumps(line) + "\n"
+
+
+def read_timeout(value):
+    """Retourne le budget (secondes) d'une requête, ou None sans budget.
+
+    Lève ValueError si `value` n'est pas un nombre strictement positif.
+    """
+    if value is None:
+        return None
+    timeout = float(value)
+    if not 0 < timeout < math.inf:
+        raise ValueError(f"Invalid timeout: {value}")
+    return timeout
+
+
+def create_app(triangulator, metrics=None, timeout=None):
+    """Crée l'application Flask autour d'un `Triangulator`.
+
+    Avec `metrics` (un `Metrics`, observateur du Triangulator), les mesures
+    sont servies sur GET /metrics. `timeout` est le budget par défaut
+    (secondes) d'une triangulation ; ?timeout= le remplace.
+    """
+    app = Flask(__name__)
+    app.config["TRIANGULATOR"] = triangulator
+
+    if metrics is not None:
+        @app.get("/metrics")
+        def getMetrics():  # noqa: N802
+            """GET /metrics (format texte de Prometheus)."""
+            return Response(metrics.render(), status=200,
+                            mimetype="text/plain; version=0.0.4")
+
+    @app.get("/triangulation/<pointSetId>")
+    def getTriangulation(pointSetId):  # noqa: N802 (operationId de la spec)
+        """GET /triangulation/{pointSetId}."""
+        engine = request.args.get("engine")
+        try:
+            triangulator.get_engine(engine or triangulator.engine)
+            budget = read_timeout(request.args.get("timeout", timeout))
+        except ValueError as e:
+            return error_response(400, str(e))
+        return to_response(triangulator.triangulate(pointSetId, engine,
+                                                    budget))
+
+    @app.post("/triangulations")
+    def getTriangulations():  # noqa: N802
+        """POST /triangulations : {"pointSetIds": [...]} -> flux NDJSON.
+
+        Une ligne par PointSet (voir `batch_line`), dans l'ordre de la
+        requête, ou dès qu'elle est prête avec ?ordered=false.
+        """
+        body = request.get_json(silent=True)
+        ids = body.get("pointSetIds") if isinstance(body, dict) else None
+        if not isinstance(ids, list) or \
+                not all(isinstance(i, str) for i in ids):
+            return error_response(400, "Expected a JSON body "
+                                       '{"pointSetIds": [string, ...]}')
+        engine = request.args.get("engine")
+        try:
+            triangulator.get_engine(engine or triangulator.engine)
+        except ValueError as e:
+            return error_response(400, str(e))
+        ordered = request.args.get("ordered", "true").lower() != "false"
+        results = triangulator.triangulate_many(ids, engine, ordered=ordered)
+        return Response((batch_line(i, r) for i, r in results), status=200,
+                        mimetype="application/x-ndjson")
+
+    return app
+
+
+def load_object(path):
+    """Charge un objet à partir d'un chemin "module:attribut"."""
+    module_name, _, attribute = path.partition(":")
+    obj = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def main(argv=None):
+    """Lance le service avec le serveur de Werkzeug.
+
+    Un seul processus, un thread par requête : le disjoncteur, le
+    regroupement des requêtes, l'ordonnanceur et les mesures (/metrics)
+    sont partagés par toutes les requêtes. Pour utiliser plusieurs cœurs,
+    --workers N confie la triangulation à N processus (`SharedMemoryPool`).
+    Le PointSetManager est protégé par un disjoncteur (`CircuitBreaker`) :
+    pendant une panne, les requêtes reçoivent aussitôt une 503.
+    Les calculs passent par un `Scheduler` (plus petits PointSets d'abord),
+    un à la fois par processus de calcul, dans la limite de --memory-budget.
+    """
+    from werkzeug.serving import run_simple
+
+    parser = argparse.ArgumentParser(description="Triangulator service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manager-url",
+                        help="URL du PointSetManager (client HTTP keep-alive)")
+    source.add_argument("--manager",
+                        help="PointSetManager à utiliser (module:attribut)")
+    parser.add_argument("--engine", default="bowyer_watson")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="processus de calcul (0 : dans les threads)")
+    parser.add_argument("--reset-timeout", type=float, default=30.0,
+                        help="secondes d'ouverture du disjoncteur")
+    parser.add_argument("--timeout", type=read_timeout,
+                        help="budget par défaut d'une triangulation (s)")
+    parser.add_argument("--memory-budget", type=int,
+                        help="mémoire des calculs simultanés (Mio)")
+    parser.add_argument("--max-waiting", type=int,
+                        help="calculs en attente au-delà desquels on refuse")
+    args = parser.parse_args(argv)
+
+    if args.manager_url:
+        manager = PointSetManagerClient(args.manager_url)
+    else:
+        manager = load_object(args.manager)
+    manager = CircuitBreaker(manager, reset_timeout=args.reset_timeout)
+    executor = SharedMemoryPool(args.workers) if args.workers else None
+    metrics = Metrics()
+    scheduler = Scheduler(
+        max(args.workers, 1),
+        None if args.memory_budget is None
+        else args.memory_budget * 1024 * 1024,
+        args.max_waiting)
+    # Les requêtes simultanées pour un même PointSet sont regroupées
+    triangulator = CoalescingTriangulator(Triangulator(
+        manager, engine=args.engine, executor=executor, observer=metrics,
+        scheduler=scheduler))
+    app = create_app(triangulator, metrics, args.timeout)
+    run_simple(args.host, args.port, app, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Triangulation de Delaunay par balayage d'enveloppe (type Delaunator).
+
+Les points sont triés par distance à un triangle germe puis ajoutés un à un
+à l'extérieur d'une enveloppe convexe qui avance ; les arêtes sont
+légalisées par bascules (flips) sur un tableau plat de demi-arêtes.
+"""
+import math
+
+from triangulator.deadline import CHECK_EVERY
+from triangulator.delaunay import bowyer_watson
+from triangulator.geometry import circumcircle_sq, incircle, orient2d
+
+
+class SweepHullFailed(Exception):
+    """Le balayage ne peut pas insérer un point (ordre d'insertion faussé)."""
+
+    def __init__(self, message):
+        """Init."""
+        super().__init__(message)
+        self.message = message
+
+
+def _pseudo_angle(dx, dy):
+    """Angle monotone dans [0, 1] sans trigonométrie."""
+    p = dx / (abs(dx) + abs(dy))
+    return (3 - p if dy > 0 else 1 + p) / 4
+
+
+class SweepHull:
+    """Triangulation par balayage d'enveloppe.
+
+    La demi-arête e appartient au triangle e // 3 et part du sommet
+    `triangles[e]` ; `halfedges[e]` est la demi-arête jumelle, ou -1 sur
+    l'enveloppe convexe. Les triangles sont dans le sens trigonométrique.
+
+    Le germe, l'ordre d'insertion et la table d'angles sont calculés sur
+    les coordonnées ramenées à la boîte englobante [0, 1]² : sinon, quand
+    un axe est bien plus étendu que l'autre, les distances arrondies
+    ignorent le petit axe et des points arrivent à l'intérieur de
+    l'enveloppe. Un point qui n'a aucune arête visible lève
+    `SweepHullFailed` (voir `sweep_hull`).
+    """
+
+    def __init__(self, points, deadline=None):
+        """Triangule `points` (liste de (x, y) ou tableau NumPy (N, 2)).
+
+        `deadline` (une `Deadline`) est vérifiée toutes les `CHECK_EVERY`
+        insertions.
+        """
+        if hasattr(points, "tolist"):
+            points = points.tolist()
+        self.points = points
+        self.deadline = deadline
+        self.triangles = []
+        self.halfedges = []
+
+        n = len(points)
+        self.hull_prev = [0] * n
+        self.hull_next = [0] * n
+        self.hull_tri = [0] * n
+        self.hash_size = max(1, math.ceil(math.sqrt(n)))
+        self.hull_hash = [-1] * self.hash_size
+        self.hull_start = 0
+        if n >= 3:
+            self._triangulate()
+
+    def _hash_key(self, i):
+        """Case de la table d'enveloppe, selon l'angle autour du centre."""
+        dx, dy = self._xs[i] - self._cx, self._ys[i] - self._cy
+        if dx == 0 and dy == 0:
+            return 0
+        return int(_pseudo_angle(dx, dy) * self.hash_size) % self.hash_size
+
+    def _normalize(self):
+        """Ramène les coordonnées à la boîte englobante [0, 1]² (`_xs`, `_ys`)."""
+        pts = self.points
+        xs = [p[0] for p in pts]
+        ys = [p[1] for p in pts]
+        x0, y0 = min(xs), min(ys)
+        sx = 1 / (max(xs) - x0) if max(xs) > x0 else 1.0
+        sy = 1 / (max(ys) - y0) if max(ys) > y0 else 1.0
+        self._xs = [(x - x0) * sx for x in xs]
+        self._ys = [(y - y0) * sy for y in ys]
+
+    def _seed(self):
+        """Choisit le triangle germe (i0, i1, i2) ou None si tout est aligné."""
+        pts = self.points
+        xs, ys = self._xs, self._ys
+        cx = cy = 0.5
+
+        # Point le plus proche du centre de la boîte
+        i0 = min(range(len(pts)),
+                 key=lambda i: (xs[i] - cx) ** 2 + (ys[i] - cy) ** 2)
+        x0, y0 = xs[i0], ys[i0]
+
+        # Point le plus proche de i0 (distinct)
+        i1, best = -1, math.inf
+        for i, (x, y) in enumerate(zip(xs, ys, strict=True)):
+            d = (x - x0) ** 2 + (y - y0) ** 2
+            if 0 < d < best:
+                i1, best = i, d
+        if i1 < 0:
+            return None
+
+        # Troisième point donnant le plus petit cercle circonscrit
+        i2, best = -1, math.inf
+        for i, p in enumerate(zip(xs, ys, strict=True)):
+            if i in (i0, i1):
+                continue
+            c = circumcircle_sq((x0, y0), (xs[i1], ys[i1]), p)
+            if c is not None and c[2] < best:
+                i2, best = i, c[2]
+
+        o = 0 if i2 < 0 else orient2d(pts[i0], pts[i1], pts[i2])
+        if o == 0:
+            # Alignés d'après les coordonnées ramenées : vérifier exactement
+            if all(orient2d(pts[i0], pts[i1], p) == 0 for p in pts):
+                return None
+            raise SweepHullFailed("No seed triangle found")
+        if o < 0:
+            i1, i2 = i2, i1
+        return i0, i1, i2
+
+    def _triangulate(self):
+        """Construit la triangulation."""
+        pts = self.points
+        self._normalize()
+        seed = self._seed()
+        if seed is None:
+            return  # points tous alignés : pas de triangle
+        i0, i1, i2 = seed
+        xs, ys = self._xs, self._ys
+        self._cx, self._cy, _ = circumcircle_sq(
+            *((xs[i], ys[i]) for i in seed))
+
+        # Tri des points par distance au centre du germe
+        cx, cy = self._cx, self._cy
+        dists = [(x - cx) ** 2 + (y - cy) ** 2
+                 for x, y in zip(xs, ys, strict=True)]
+        order = sorted(range(len(pts)), key=dists.__getitem__)
+
+        hull_next = self.hull_next
+        hull_prev = self.hull_prev
+        hull_tri = self.hull_tri
+        hull_hash = self.hull_hash
+
+        # Enveloppe initiale i0 -> i1 -> i2 (sens trigonométrique)
+        self.hull_start = i0
+        hull_next[i0] = hull_prev[i2] = i1
+        hull_next[i1] = hull_prev[i0] = i2
+        hull_next[i2] = hull_prev[i1] = i0
+        hull_tri[i0], hull_tri[i1], hull_tri[i2] = 0, 1, 2
+        for i in seed:
+            hull_hash[self._hash_key(i)] = i
+        self._add_triangle(i0, i1, i2, -1, -1, -1)
+
+        deadline = self.deadline
+        xp = yp = None
+        for k, i in enumerate(order):
+            if deadline is not None and k % CHECK_EVERY == 0:
+                deadline.check()
+            x, y = p = pts[i]
+
+            # Ignorer les doublons exacts consécutifs (la validation retire
+            # déjà les doublons) et les points du germe
+            if x == xp and y == yp:
+                continue
+            xp, yp = x, y
+            if i in seed:
+                continue
+
+            # Arête visible de l'enveloppe, trouvée via la table d'angles
+            key = self._hash_key(i)
+            start = 0
+            for j in range(self.hash_size):
+                start = hull_hash[(key + j) % self.hash_size]
+                if start != -1 and start != hull_next[start]:
+                    break
+            start = hull_prev[start]
+            e = start
+            while orient2d(pts[e], pts[hull_next[e]], p) >= 0:
+                e = hull_next[e]
+                if e == start:
+                    e = -1
+                    break
+            if e == -1:
+                # Doublon exact non consécutif, sinon point à l'intérieur
+                # de l'enveloppe : l'ordre d'insertion est faussé
+                if any(pts[j][0] == x and pts[j][1] == y for j in order[:k]):
+                    continue
+                raise SweepHullFailed(f"Point {i} is inside the hull")
+
+            # Premier triangle depuis le point, puis légalisation
+            t = self._add_triangle(e, i, hull_next[e], -1, -1, hull_tri[e])
+            hull_tri[i] = self._legalize(t + 2)
+            hull_tri[e] = t
+
+            # Avancer sur l'enveloppe tant que les arêtes sont visibles
+            n = hull_next[e]
+            while True:
+                q = hull_next[n]
+                if orient2d(pts[n], pts[q], p) >= 0:
+                    break
+                t = self._add_triangle(n, i, q, hull_tri[i], -1, hull_tri[n])
+                hull_tri[i] = self._legalize(t + 2)
+                hull_next[n] = n  # retiré de l'enveloppe
+                n = q
+
+            # Reculer de l'autre côté
+            if e == start:
+                while True:
+                    q = hull_prev[e]
+                    if orient2d(pts[q], pts[e], p) >= 0:
+                        break
+                    t = self._add_triangle(q, i, e, -1, hull_tri[e], hull_tri[q])
+                    self._legalize(t + 2)
+                    hull_tri[q] = t
+                    hull_next[e] = e  # retiré de l'enveloppe
+                    e = q
+
+            # Mise à jour de l'enveloppe et de la table
+            self.hull_start = hull_prev[i] = e
+            hull_next[e] = hull_prev[n] = i
+            hull_next[i] = n
+            hull_hash[self._hash_key(i)] = i
+            hull_hash[self._hash_key(e)] = e
+
+    def _link(self, a, b):
+        """Relie deux demi-arêtes jumelles."""
+        self.halfedges[a] = b
+        if b != -1:
+            self.halfedges[b] = a
+
+    def _add_triangle(self, i0, i1, i2, a, b, c):
+        """Ajoute le triangle (i0, i1, i2) et le relie aux jumelles a, b, c."""
+        t = len(self.triangles)
+        self.triangles.extend((i0, i1, i2))
+        self.halfedges.extend((-1, -1, -1))
+        self._link(t, a)
+        self._link(t + 1, b)
+        self._link(t + 2, c)
+        return t
+
+    def _legalize(self, a):
+        """Bascule les arêtes non Delaunay à partir de la demi-arête a.
+
+        Retourne la demi-arête qui part du point inséré vers l'enveloppe.
+        """
+        triangles = self.triangles
+        halfedges = self.halfedges
+        pts = self.points
+        stack = []
+        ar = 0
+
+        while True:
+            b = halfedges[a]
+            a0 = a - a % 3
+            ar = a0 + (a + 2) % 3
+
+            if b == -1:  # arête de l'enveloppe convexe
+                if not stack:
+                    break
+                a = stack.pop()
+                continue
+
+            #          pl                    pl
+            #         /||\                  /  \
+            #      al/ || \bl            al/    \a
+            #       /  ||  \              /      \
+            #      /  a||b  \    flip    /___ar___\
+            #    p0\   ||   /p1   =>   p0\---bl---/p1
+            #       \  ||  /              \      /
+            #      ar\ || /br             b\    /br
+            #         \||/                  \  /
+            #          pr                    pr
+            b0 = b - b % 3
+            al = a0 + (a + 1) % 3
+            bl = b0 + (b + 2) % 3
+
+            p0 = triangles[ar]
+            pr = triangles[a]
+            pl = triangles[al]
+            p1 = triangles[bl]
+
+            if incircle(pts[pr], pts[pl], pts[p0], pts[p1]) > 0:
+                triangles[a] = p1
+                triangles[b] = p0
+
+                hbl = halfedges[bl]
+                # Arête basculée de l'autre côté de l'enveloppe (rare)
+                if hbl == -1:
+                    e = self.hull_start
+                    while True:
+                        if self.hull_tri[e] == bl:
+                            self.hull_tri[e] = a
+                            break
+                        e = self.hull_prev[e]
+                        if e == self.hull_start:
+                            break
+                self._link(a, hbl)
+                self._link(b, halfedges[ar])
+                self._link(ar, bl)
+
+                stack.append(b0 + (b + 1) % 3)
+            else:
+                if not stack:
+                    break
+                a = stack.pop()
+
+        return ar
+
+
+def sweep_hull(points, deadline=None):
+    """Triangulation de Delaunay en O(n log n) par balayage d'enveloppe.
+
+    Si le balayage échoue (`SweepHullFailed`), la triangulation est
+    refaite par `bowyer_watson`.
+    """
+    try:
+        t = SweepHull(points, deadline).triangles
+    except SweepHullFailed:
+        return bowyer_watson(points, deadline)
+    return [(t[j], t[j + 1], t[j + 2]) for j in range(0, len(t), 3)]
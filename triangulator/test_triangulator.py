@@ -1,12 +1,65 @@
 """Test du triangulator."""
+import asyncio
+import base64
+import io
+import json
+import math
+import os
 import random
+import socket
 import struct
+import threading
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 
 import pytest
 
-from triangulator.triangulator import Triangulator
+from triangulator import divide_conquer
+from triangulator.async_triangulator import AsyncTriangulator
+from triangulator.benchmark import DISTRIBUTIONS, compare, fit_exponent, run
+from triangulator.benchmark import main as benchmark_main
+from triangulator.breaker import CircuitBreaker
+from triangulator.cache import (
+    ContentCache,
+    DirectoryBackend,
+    ResultCache,
+    SQLiteBackend,
+)
+from triangulator.client import PointSetManagerClient
+from triangulator.coalescing import CoalescingTriangulator, SingleFlight
+from triangulator.deadline import (
+    CHECK_EVERY,
+    Deadline,
+    DeadlineExceeded,
+    estimate_seconds,
+)
+from triangulator.delaunay import bowyer_watson, bowyer_watson_numpy
+from triangulator.divide_conquer import divide_and_conquer
+from triangulator.geometry import (
+    circumcircle,
+    circumcircle_sq,
+    incircle,
+    orient2d,
+    point_in_circumcircle_sq,
+)
+from triangulator.incremental import IncrementalTriangulation
+from triangulator.ingest import open_pointset, spool_pointset
+from triangulator.metrics import Metrics
+from triangulator.ordering import brio_order, hilbert_index, hilbert_keys
+from triangulator.process_pool import SharedMemoryPool
+from triangulator.scheduler import AdmissionRejected, Scheduler, estimate_bytes
+from triangulator.service import batch_line, create_app, stream_binary
+from triangulator.sweephull import SweepHull, SweepHullFailed, sweep_hull
+from triangulator.triangulator import InvalidPointSetBinary, Triangulator
+from triangulator.validation import (
+    InvalidPointSet,
+    unique_indices,
+    validate_points,
+)
 
 
 def isTriangle(p1, p2, p3):
@@ -18,6 +71,29 @@ def isTriangle(p1, p2, p3):
     return area > 0
 
 
+def is_delaunay(points, triangles):
+    """Vérifie la propriété du cercle vide et l'absence de chevauchement."""
+    edges = set()
+    for a, b, c in triangles:
+        (x1, y1), (x2, y2), (x3, y3) = points[a], points[b], points[c]
+        d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+        if d <= 0:
+            return False
+        s1, s2, s3 = x1 ** 2 + y1 ** 2, x2 ** 2 + y2 ** 2, x3 ** 2 + y3 ** 2
+        ux = (s1 * (y2 - y3) + s2 * (y3 - y1) + s3 * (y1 - y2)) / d
+        uy = (s1 * (x3 - x2) + s2 * (x1 - x3) + s3 * (x2 - x1)) / d
+        r2 = (ux - x1) ** 2 + (uy - y1) ** 2
+        for i, (x, y) in enumerate(points):
+            if i not in (a, b, c) and (x - ux) ** 2 + (y - uy) ** 2 < r2 * (1 - 1e-9):
+                return False
+        # Une arête orientée n'appartient qu'à un seul triangle
+        for e in ((a, b), (b, c), (c, a)):
+            if e in edges:
+                return False
+            edges.add(e)
+    return True
+
+
 @pytest.fixture
 def mock_psm():
     """mock_psm."""
@@ -34,6 +110,49 @@ def mock_psm():
     return mock
 
 
+@pytest.fixture
+def psm_server():
+    """PointSetManager local (HTTP/1.1 keep-alive) pour tester le client.
+
+    `server.pointsets` : id -> binaire ; `server.failures` : nombre de 503 à
+    renvoyer avant de répondre ; `server.delay` : attente avant réponse.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802
+            server.clients.add(self.client_address)
+            time.sleep(server.delay)
+            pid = self.path.rsplit("/", 1)[-1]
+            if server.failures:
+                server.failures -= 1
+                self.reply(503, b'{"code": "DB", "message": "unavailable"}')
+            elif pid in server.pointsets:
+                self.reply(200, server.pointsets[pid])
+            else:
+                self.reply(404, b'{"code": "NOT_FOUND", "message": "not found"}')
+
+        def reply(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.pointsets, server.clients = {}, set()
+    server.failures, server.delay = 0, 0.0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
 def make_pointSet(points):
     """Make_pointSet."""
     b = struct.pack("!I", len(points))
@@ -42,6 +161,18 @@ def make_pointSet(points):
     return b
 
 
+def tr_points(res):
+    """Points de la partie sommets d'une réponse."""
+    return Triangulator(None).deserialize_pointset(res["PointSet"])
+
+
+def tr_triangles(res):
+    """Triangles de la partie triangles d'une réponse."""
+    binary = res["Triangles"]
+    n = struct.unpack_from("!I", binary)[0]
+    return [struct.unpack_from("!III", binary, 4 + 12 * i) for i in range(n)]
+
+
 def test_invalid_uuid(mock_psm):
     """INVALID UUID."""
     mock_psm.get_point_set.return_value = {"status": 400,
@@ -178,6 +309,8 @@ def test_triangulate_success(mock_psm):
     assert result["status"] == 200
     assert "Triangles" in result
     assert "PointSet" in result
+    assert result["Triangulation"] == result["PointSet"].tobytes() + \
+        result["Triangles"].tobytes()
 
     # On peut également vérifier que la désérialisation renvoie bien les points
     deserialized_points = tr.deserialize_pointset(result["PointSet"])
@@ -197,6 +330,1392 @@ def test_triangulate_success(mock_psm):
         assert isTriangle(p1, p2, p3)
 
 
+def test_bowyer_watson_delaunay():
+    """Le maillage produit respecte la propriété de Delaunay."""
+    rng = random.Random(1)
+    points = [(rng.random() * 100, rng.random() * 100) for _ in range(200)]
+    triangles = bowyer_watson(points)
+
+    assert len(triangles) <= 2 * len(points) - 5
+    assert is_delaunay(points, triangles)
+
+
+def test_bowyer_watson_square():
+    """Un carré donne deux triangles."""
+    triangles = bowyer_watson([(0, 0), (1, 0), (1, 1), (0, 1)])
+    assert len(triangles) == 2
+    assert {v for t in triangles for v in t} == {0, 1, 2, 3}
+
+
+def test_circumcircle_sq():
+    """Le cercle en rayon au carré est cohérent avec circumcircle."""
+    xc, yc, r = circumcircle((0, 0), (2, 0), (0, 2))
+    c = circumcircle_sq((0, 0), (2, 0), (0, 2))
+
+    assert c == pytest.approx((xc, yc, r ** 2))
+    assert point_in_circumcircle_sq((1, 1), c)
+    assert point_in_circumcircle_sq((2, 2), c)  # sur le cercle
+    assert not point_in_circumcircle_sq((3, 3), c)
+    assert circumcircle_sq((0, 0), (1, 1), (2, 2)) is None
+
+
+def test_deserialize_pointset_array(mock_psm):
+    """La désérialisation NumPy est une vue sans copie du binaire."""
+    np = pytest.importorskip("numpy")
+    points = [(0.5, 1.5), (2.0, -3.0), (4.25, 0.0)]
+    binary = bytearray(make_pointSet(points))
+    tr = Triangulator(mock_psm)
+
+    arr = tr.deserialize_pointset_array(binary)
+
+    assert arr.shape == (3, 2)
+    assert arr.tolist() == [list(p) for p in points]
+    assert np.shares_memory(arr, np.frombuffer(binary, dtype=np.uint8))
+    assert tr.serialize_pointset(arr) == bytes(binary)
+
+
+def test_triangulate_without_numpy(mock_psm):
+    """Sans NumPy, le chemin struct est utilisé et donne le même résultat."""
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet([(0, 0), (1, 0), (1, 1), (0, 1)])
+    }
+    expected = Triangulator(mock_psm).triangulate(str(uuid.uuid4()))
+
+    with patch("triangulator.triangulator.np", None):
+        tr = Triangulator(mock_psm)
+        res = tr.triangulate(str(uuid.uuid4()))
+
+    assert not tr.use_numpy
+    assert res == expected
+
+
+def test_serialize_triangulation_layout(mock_psm):
+    """Un seul tampon : partie sommets puis partie triangles (spec)."""
+    tr = Triangulator(mock_psm)
+    points = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0)]
+    triangles = [(0, 1, 2), (1, 3, 2)]
+
+    binary, split = tr.serialize_triangulation(points, triangles)
+
+    assert len(binary) == 4 + 8 * 4 + 4 + 12 * 2
+    assert split == 4 + 8 * 4
+    assert binary[:split] == make_pointSet(points)
+    assert struct.unpack("!I6I", binary[split:]) == (2, 0, 1, 2, 1, 3, 2)
+    assert binary[:split] == tr.serialize_pointset(points)
+    assert binary[split:] == tr.serialize_triangles(triangles)
+
+
+def test_serialize_triangulation_numpy(mock_psm):
+    """Le chemin NumPy écrit exactement les mêmes octets."""
+    np = pytest.importorskip("numpy")
+    tr = Triangulator(mock_psm)
+    points = [(0.5, 0.25), (1.0, 0.0), (0.0, 1.0)]
+    triangles = [(0, 1, 2)]
+
+    expected, _ = tr.serialize_triangulation(points, triangles)
+    binary, _ = tr.serialize_triangulation(np.array(points, dtype=np.float32),
+                                           np.array(triangles))
+
+    assert binary == expected
+
+
+def test_numpy_engine_same_triangles():
+    """Le moteur vectorisé donne la même triangulation."""
+    pytest.importorskip("numpy")
+    rng = random.Random(2)
+    points = [(rng.random() * 100, rng.random() * 100) for _ in range(200)]
+
+    expected = {tuple(sorted(t)) for t in bowyer_watson(points)}
+    triangles = {tuple(sorted(t)) for t in bowyer_watson_numpy(points).tolist()}
+
+    assert triangles == expected
+
+
+def test_numpy_engine_never_partial():
+    """Un point non inséré lève une erreur au lieu d'un maillage partiel."""
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        bowyer_watson_numpy([(0, 0), (1, 0), (math.nan, 0.5), (0, 1)])
+
+
+def test_triangulate_engine_selection(mock_psm):
+    """Le moteur se choisit au constructeur ou à l'appel."""
+    pytest.importorskip("numpy")
+    points = [(0, 0), (1, 0), (1, 1), (0, 1), (0.5, 1.5)]
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet(points)
+    }
+
+    res_default = Triangulator(mock_psm).triangulate(str(uuid.uuid4()))
+    res_ctor = Triangulator(mock_psm, engine="numpy").triangulate(
+        str(uuid.uuid4()))
+    res_call = Triangulator(mock_psm).triangulate(str(uuid.uuid4()),
+                                                  engine="numpy")
+
+    assert res_ctor["status"] == res_call["status"] == 200
+    assert len(res_ctor["Triangles"]) == len(res_default["Triangles"])
+    assert res_call["Triangles"] == res_ctor["Triangles"]
+    with pytest.raises(ValueError):
+        Triangulator(mock_psm, engine="unknown")
+
+
+def test_hilbert_index():
+    """Courbe de Hilbert d'ordre 1 : (0,0), (0,1), (1,1), (1,0)."""
+    cells = [(0, 0), (0, 1), (1, 1), (1, 0)]
+    assert [hilbert_index(x, y, 1) for x, y in cells] == [0, 1, 2, 3]
+
+
+def test_brio_order_permutation():
+    """BRIO retourne une permutation déterministe des indices."""
+    rng = random.Random(3)
+    points = [(rng.random(), rng.random()) for _ in range(500)]
+
+    order = brio_order(points)
+
+    assert sorted(order) == list(range(500))
+    assert order == brio_order(points)
+    # Le dernier tour (la moitié des points) est trié le long de la courbe
+    keys = hilbert_keys(points)
+    last_round = [keys[i] for i in order[250:]]
+    assert last_round == sorted(last_round)
+
+
+def test_orient2d_exact():
+    """orient2d reste exact là où le calcul flottant se trompe."""
+    assert orient2d((0, 0), (1, 0), (0, 1)) > 0
+    assert orient2d((0, 0), (0, 1), (1, 0)) < 0
+    # Points presque alignés : le flottant naïf donne 0
+    pa, pb, pc = (0.5, 0.5000000000000001), (12.0, 12.0), (24.0, 24.0)
+    assert (pa[0] - pc[0]) * (pb[1] - pc[1]) == (pa[1] - pc[1]) * (pb[0] - pc[0])
+    assert orient2d(pa, pb, pc) > 0
+    assert orient2d((0.5, 0.5), pb, pc) == 0
+
+
+def test_incircle_cocircular():
+    """Incircle vaut exactement 0 pour des points cocirculaires."""
+    square = [(0, 0), (1, 0), (1, 1)]
+    assert incircle(*square, (0, 1)) == 0
+    assert incircle(*square, (0.5, 0.5)) > 0
+    assert incircle(*square, (2, 2)) < 0
+    assert incircle((0.1, 0.1), (0.3, 0.1), (0.3, 0.3), (0.1, 0.3)) == 0
+
+
+@pytest.mark.parametrize("engine", ["bowyer_watson", "numpy", "sweep_hull"])
+def test_degenerate_inputs(engine):
+    """Grille et polygone régulier : triangulation complète et valide."""
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    triangulate_points = Triangulator.get_engine(engine)
+    grid = [(i * 0.1, j * 0.1) for i in range(12) for j in range(12)]
+    polygon = [(math.cos(2 * math.pi * k / 32), math.sin(2 * math.pi * k / 32))
+               for k in range(32)] + [(0.0, 0.0)]
+
+    grid_triangles = [tuple(t) for t in triangulate_points(grid)]
+    polygon_triangles = [tuple(t) for t in triangulate_points(polygon)]
+
+    assert len(grid_triangles) == 2 * 11 * 11
+    assert is_delaunay(grid, grid_triangles)
+    assert len(polygon_triangles) == 32
+    assert is_delaunay(polygon, polygon_triangles)
+
+
+def test_sweep_hull_delaunay():
+    """Le balayage d'enveloppe couvre toute l'enveloppe convexe."""
+    rng = random.Random(4)
+    # Points sur un cercle (enveloppe connue) et à l'intérieur
+    points = [(math.cos(2 * math.pi * k / 20) * 50,
+               math.sin(2 * math.pi * k / 20) * 50) for k in range(20)]
+    points += [(rng.uniform(-30, 30), rng.uniform(-30, 30)) for _ in range(180)]
+
+    triangles = sweep_hull(points)
+    expected = {tuple(sorted(t)) for t in bowyer_watson(points)}
+
+    assert len(triangles) == 2 * len(points) - 20 - 2
+    assert is_delaunay(points, triangles)
+    assert expected == {tuple(sorted(t)) for t in triangles}
+
+
+def assert_convex_hull(points, triangles):
+    """Vérifie que le bord de la triangulation est l'enveloppe convexe."""
+    counts = {}
+    for t in triangles:
+        for a, b in zip(t, (*t[1:], t[0]), strict=True):
+            key = tuple(sorted((a, b)))
+            counts[key] = counts.get(key, 0) + 1
+    boundary = [e for e, c in counts.items() if c == 1]
+    for a, b in boundary:  # tous les points d'un même côté
+        sides = {math.copysign(1, orient2d(points[a], points[b], p))
+                 for i, p in enumerate(points)
+                 if i not in (a, b) and orient2d(points[a], points[b], p)}
+        assert len(sides) <= 1, (a, b)
+    hull = {i for e in boundary for i in e}
+    # Tous les points distincts sont utilisés (doublons fusionnés)
+    assert len(triangles) == 2 * len(set(points)) - 2 - len(hull)
+
+
+@pytest.mark.parametrize("engine", ["bowyer_watson", "numpy", "sweep_hull",
+                                    "divide_conquer"])
+@pytest.mark.parametrize("scale, offset", [(1e9, 0.0), (1e3, 4e8),
+                                           (1e8, -5e7), (3e38, 0.0)])
+def test_engines_large_coordinates(mock_psm, engine, scale, offset):
+    """Grandes coordonnées (float32) : triangulation complète jusqu'à l'enveloppe."""
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    rng = random.Random(7)
+    points = [(0.0, 0.0), (scale, 0.0), (0.0, scale), (scale, scale)]
+    points += [(rng.uniform(0, scale), rng.uniform(0, scale))
+               for _ in range(300)]
+    binary = make_pointSet([(x + offset, y + offset) for x, y in points])
+    mock_psm.get_point_set.return_value = {"status": 200, "PointSet": binary}
+
+    res = Triangulator(mock_psm).triangulate("id", engine)
+
+    assert res["status"] == 200
+    points, triangles = tr_points(res), tr_triangles(res)
+    assert_convex_hull(points, triangles)
+    for a, b, c in triangles:  # cercle vide, en prédicats exacts
+        assert orient2d(points[a], points[b], points[c]) > 0
+        assert all(incircle(points[a], points[b], points[c], p) <= 0
+                   for p in points)
+
+
+@pytest.mark.parametrize("engine", ["bowyer_watson", "sweep_hull",
+                                    "divide_conquer"])
+def test_engines_tiny_coordinates(mock_psm, engine):
+    """Points distincts très proches de 0 : aucun n'est confondu."""
+    rng = random.Random(3)
+    points = [(rng.uniform(1e-20, 2e-20), rng.uniform(1e-20, 2e-20))
+              for _ in range(50)]
+    binary = make_pointSet(points)
+    mock_psm.get_point_set.return_value = {"status": 200, "PointSet": binary}
+
+    res = Triangulator(mock_psm).triangulate("id", engine)
+
+    assert res["status"] == 200
+    points, triangles = tr_points(res), tr_triangles(res)
+    assert len(set(points)) == 50
+    assert_convex_hull(points, triangles)
+
+
+@pytest.mark.parametrize("engine", ["sweep_hull", "divide_conquer"])
+@pytest.mark.parametrize("scale", [1e9, 1e12])
+def test_engines_anisotropic(mock_psm, engine, scale):
+    """Un axe bien plus étendu que l'autre : aucun point n'est perdu."""
+    for seed in range(5):
+        rng = random.Random(seed)
+        points = list({(rng.randrange(12) * scale, float(rng.randrange(12)))
+                       for _ in range(60)})
+        rng.shuffle(points)
+        mock_psm.get_point_set.return_value = {
+            "status": 200, "PointSet": make_pointSet(points)}
+
+        res = Triangulator(mock_psm).triangulate("id", engine)
+
+        assert res["status"] == 200
+        assert len(tr_triangles(res)) == len(bowyer_watson(tr_points(res)))
+        assert_convex_hull(tr_points(res), tr_triangles(res))
+
+
+def test_sweep_hull_falls_back():
+    """Un point sans arête visible n'est pas ignoré : repli sur Bowyer-Watson."""
+    points = [(0, 0), (1, 0), (0, 1), (0.2, 0.2), (1, 1)]
+    # Germe imposé contenant le point 3 : il arrive dans l'enveloppe
+    with patch.object(SweepHull, "_seed", lambda self: (0, 1, 2)):
+        with pytest.raises(SweepHullFailed):
+            SweepHull(points)
+        triangles = sweep_hull(points)
+
+    assert {frozenset(t) for t in triangles} == {
+        frozenset(t) for t in bowyer_watson(points)}
+
+
+def test_sweep_hull_duplicates():
+    """Les doublons sont ignorés."""
+    points = [(0, 0), (1, 0), (0, 1), (1, 1), (1, 1), (0.5, 0.5), (0, 0)]
+
+    triangles = sweep_hull(points)
+
+    assert len(triangles) == 4
+    assert {v for t in triangles for v in t} == {0, 1, 2, 3, 5}
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_triangulate_non_finite(mock_psm, use_numpy):
+    """Coordonnées NaN ou infinies : erreur 400."""
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet([(0, 0), (1, 0), (float("nan"), 1),
+                                   (float("inf"), 2)])
+    }
+    res = Triangulator(mock_psm, use_numpy=use_numpy).triangulate(
+        str(uuid.uuid4()))
+
+    assert res["status"] == 400
+    assert "nan or infinite" in res["error"].lower()
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_triangulate_duplicates_merged(mock_psm, use_numpy):
+    """Les doublons sont retirés et les indices restent ceux d'origine."""
+    points = [(0, 0), (1, 0), (0, 0), (1, 1), (0, 1), (1, 1)]
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet(points)
+    }
+    res = Triangulator(mock_psm, use_numpy=use_numpy).triangulate(
+        str(uuid.uuid4()))
+
+    assert res["status"] == 200
+    assert tr_points(res) == points
+    triangles = tr_triangles(res)
+    assert len(triangles) == 2
+    assert {v for t in triangles for v in t} == {0, 1, 3, 4}
+
+
+def test_triangulate_duplicates_rejected(mock_psm):
+    """Avec duplicates="reject", les doublons donnent une erreur 400."""
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet([(0, 0), (1, 0), (0, 1), (0, 1)])
+    }
+    res = Triangulator(mock_psm, duplicates="reject").triangulate(
+        str(uuid.uuid4()))
+
+    assert res["status"] == 400
+    assert "duplicate" in res["error"].lower()
+
+
+def test_validate_points_near_duplicates_and_segment():
+    """Quasi-doublons (grille de hachage) et segment malgré des doublons."""
+    points = [(0, 0), (1, 0), (1.0004, 0.0003), (0, 1), (-0.0002, 1)]
+    unique, kept = validate_points(points, tolerance=1e-3)
+    assert kept == [0, 1, 3]
+    assert unique == [(0, 0), (1, 0), (0, 1)]
+
+    with pytest.raises(InvalidPointSet, match="segment"):
+        validate_points([(0, 0), (0, 0), (1, 1), (2, 2)])
+    with pytest.raises(InvalidPointSet, match="Not enough"):
+        validate_points([(0, 0), (0, 0), (1, 1)])
+
+
+def test_unique_indices_vectorized_tolerance():
+    """Grille vectorisée : mêmes points gardés que la boucle Python."""
+    np = pytest.importorskip("numpy")
+    rng = random.Random(4)
+    for tolerance in (1e-3, 0.05, 0.3):
+        points = [(round(rng.random(), 1), rng.random()) for _ in range(300)]
+        points += points[:20]
+        expected = unique_indices(points, tolerance)
+
+        kept = unique_indices(np.array(points), tolerance)
+
+        assert list(kept) == expected
+
+
+def test_result_cache_lru_and_ttl():
+    """Éviction LRU au-delà du budget en octets et expiration (TTL)."""
+    now = [0.0]
+    cache = ResultCache(max_bytes=100, ttl=10, clock=lambda: now[0])
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"  # "a" devient le plus récent
+    cache.put("c", "C", 40)       # évince "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+    assert not cache.put("big", "X", 101)
+    now[0] = 11.0
+    assert cache.get("a") is None  # expiré
+    assert cache.stats() == {"entries": 1, "bytes": 40, "hits": 2,
+                             "misses": 2, "evictions": 1}
+
+
+def test_triangulate_uses_cache(mock_psm):
+    """Un PointSet déjà triangulé est servi depuis le cache."""
+    points = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet(points)
+    }
+    cache = ResultCache(max_bytes=1 << 20)
+    tr = Triangulator(mock_psm, cache=cache)
+    pid = str(uuid.uuid4())
+
+    first = tr.triangulate(pid)
+    second = tr.triangulate(pid)
+
+    assert first == second
+    assert mock_psm.get_point_set.call_count == 1
+    assert cache.hits == 1 and cache.misses == 1
+    with pytest.raises(TypeError):
+        second["Triangulation"][0] = 1  # vue en lecture seule
+
+    # Les erreurs ne sont pas mises en cache
+    mock_psm.get_point_set.return_value = {"status": 404, "error": "x"}
+    assert tr.triangulate("other")["status"] == 404
+    assert tr.triangulate("other")["status"] == 404
+    assert mock_psm.get_point_set.call_count == 3
+
+
+@pytest.mark.parametrize("backend", [None, "directory", "sqlite"])
+def test_content_cache_shared_across_ids(mock_psm, tmp_path, backend):
+    """Un même nuage sous deux identifiants n'est triangulé qu'une fois."""
+    if backend == "directory":
+        backend = DirectoryBackend(str(tmp_path / "cache"))
+    elif backend == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet([(0, 0), (1, 0), (1, 1), (0, 1)])
+    }
+    tr = Triangulator(mock_psm, content_cache=ContentCache(1 << 20, backend))
+
+    with patch("triangulator.triangulator.bowyer_watson",
+               wraps=bowyer_watson) as engine:
+        first = tr.triangulate(str(uuid.uuid4()))
+        second = tr.triangulate(str(uuid.uuid4()))
+
+    assert engine.call_count == 1
+    assert first == second
+    assert tr_triangles(second) == tr_triangles(first)
+
+    if backend is not None:
+        # Après "redémarrage" : le disque sert l'entrée
+        restarted = Triangulator(mock_psm,
+                                 content_cache=ContentCache(1 << 20, backend))
+        with patch("triangulator.triangulator.bowyer_watson") as engine:
+            third = restarted.triangulate(str(uuid.uuid4()))
+        engine.assert_not_called()
+        assert third == first
+        assert restarted.content_cache.disk_hits == 1
+
+
+def test_directory_backend_failed_put(tmp_path):
+    """Une écriture ratée ne laisse pas de fichier temporaire."""
+    backend = DirectoryBackend(str(tmp_path / "cache"))
+
+    with patch("triangulator.cache.os.replace", side_effect=OSError("disk")), \
+            pytest.raises(OSError):
+        backend.put("abcdef", b"data")
+
+    assert os.listdir(tmp_path / "cache" / "ab") == []
+    assert backend.get("abcdef") is None
+
+
+def test_service_get_triangulation(mock_psm):
+    """GET /triangulation/{id} renvoie le binaire `Triangles` de la spec."""
+    points = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet(points)
+    }
+    tr = Triangulator(mock_psm)
+    client = create_app(tr).test_client()
+
+    response = client.get(f"/triangulation/{uuid.uuid4()}")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/octet-stream"
+    body = response.get_data()
+    assert int(response.headers["Content-Length"]) == len(body)
+    assert body[:4 + 8 * 4] == make_pointSet(points)
+    assert struct.unpack_from("!I", body, 4 + 8 * 4)[0] == 2
+
+
+@pytest.mark.parametrize("status, code", [(400, "BAD_REQUEST"),
+                                          (404, "POINTSET_NOT_FOUND"),
+                                          (503, "SERVICE_UNAVAILABLE")])
+def test_service_errors(mock_psm, status, code):
+    """Les erreurs sont renvoyées en JSON (schéma `Error`)."""
+    mock_psm.get_point_set.return_value = {"status": status, "error": "x"}
+    client = create_app(Triangulator(mock_psm)).test_client()
+
+    response = client.get("/triangulation/some-id")
+
+    assert response.status_code == status
+    assert response.get_json()["code"] == code
+    assert response.get_json()["message"]
+
+
+def test_stream_binary_chunks():
+    """Le binaire est envoyé par morceaux."""
+    view = memoryview(bytes(range(10)))
+    assert list(stream_binary(view, 4)) == [b"\x00\x01\x02\x03",
+                                            b"\x04\x05\x06\x07",
+                                            b"\x08\x09"]
+
+
+def test_client_keep_alive(psm_server):
+    """Le client réutilise sa connexion et renvoie les dicts attendus."""
+    binary = make_pointSet([(0, 0), (1, 0), (0, 1)])
+    psm_server.pointsets["abc"] = binary
+
+    with PointSetManagerClient(psm_server.url) as client:
+        for _ in range(3):
+            assert client.get_point_set("abc") == {"status": 200,
+                                                   "PointSet": binary}
+        missing = client.get_point_set("unknown")
+
+    assert missing == {"status": 404, "error": "not found"}
+    assert client.connections_opened == 1
+    assert len(psm_server.clients) == 1
+
+
+def test_client_retries_with_jitter(psm_server):
+    """Les 503 sont retentés avec une attente aléatoire."""
+    psm_server.pointsets["abc"] = make_pointSet([(0, 0), (1, 0), (0, 1)])
+    psm_server.failures = 2
+    sleeps = []
+    client = PointSetManagerClient(psm_server.url, retries=2, backoff=0.5,
+                                   sleep=sleeps.append, rng=lambda: 0.5)
+
+    assert client.get_point_set("abc")["status"] == 200
+    assert sleeps == [0.25, 0.5]
+
+    psm_server.failures = 5
+    res = client.get_point_set("abc")
+    assert res == {"status": 503, "error": "unavailable"}
+
+
+def test_client_read_timeout(psm_server):
+    """Un PointSetManager trop lent donne une erreur 503 au Triangulator."""
+    psm_server.delay = 0.5
+    client = PointSetManagerClient(psm_server.url, read_timeout=0.05,
+                                   retries=1, sleep=lambda s: None)
+
+    res = Triangulator(client).triangulate("abc")
+
+    assert res["status"] == 503
+    assert "communication" in res["error"].lower()
+
+
+def test_client_no_resend_on_timeout(psm_server):
+    """Un délai dépassé sur une connexion réutilisée n'est pas renvoyé."""
+    psm_server.pointsets["abc"] = make_pointSet([(0, 0), (1, 0), (0, 1)])
+    client = PointSetManagerClient(psm_server.url, read_timeout=0.2,
+                                   retries=0)
+    assert client.get_point_set("abc")["status"] == 200
+    psm_server.delay = 1.0
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        client.get_point_set("abc")
+
+    assert time.monotonic() - start < 0.6
+    assert client.connections_opened == 1
+
+
+def test_client_resends_on_closed_connection(psm_server):
+    """Une connexion fermée par le serveur est remplacée sans nouvel essai."""
+    psm_server.pointsets["abc"] = make_pointSet([(0, 0), (1, 0), (0, 1)])
+    client = PointSetManagerClient(psm_server.url, retries=0)
+    assert client.get_point_set("abc")["status"] == 200
+    for conn in client._idle:
+        conn.sock.shutdown(socket.SHUT_RDWR)
+
+    assert client.get_point_set("abc")["status"] == 200
+    assert client.connections_opened == 2
+
+
+def test_coalescing_threads(mock_psm):
+    """Des requêtes simultanées pour un même PointSet ne font qu'un calcul."""
+    release = threading.Event()
+    binary = make_pointSet([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+    def slow_get(pointset_id):
+        release.wait(5)
+        return {"status": 200, "PointSet": binary}
+
+    mock_psm.get_point_set.side_effect = slow_get
+    statuses = []
+    tr = CoalescingTriangulator(Triangulator(
+        mock_psm, observer=lambda e, v: e == "status" and statuses.append(v)))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        tr.triangulate("same-id"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while tr.flights.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.2)  # laisser les autres threads rejoindre le calcul
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert mock_psm.get_point_set.call_count == 1
+    assert len(results) == 8
+    assert all(r == results[0] and r["status"] == 200 for r in results)
+    assert tr.flights.in_flight() == 0
+    assert statuses == [200] * 8  # un statut par appelant, pour /metrics
+
+
+def test_coalescing_follower_deadline(mock_psm):
+    """Un appelant qui attend le calcul d'un autre garde sa propre échéance."""
+    release = threading.Event()
+    binary = make_pointSet([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+    def slow_get(pointset_id):
+        release.wait(5)
+        return {"status": 200, "PointSet": binary}
+
+    mock_psm.get_point_set.side_effect = slow_get
+    tr = CoalescingTriangulator(Triangulator(mock_psm))
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault(
+        "leader", tr.triangulate("same-id", timeout=0.3)))
+    leader.start()
+    while tr.flights.in_flight() == 0:
+        time.sleep(0.001)
+
+    start = time.monotonic()
+    follower = tr.triangulate("same-id", timeout=0.3)
+    elapsed = time.monotonic() - start
+    release.set()
+    leader.join()
+
+    # La récupération du premier n'est pas interrompue : il finit en retard
+    assert follower["status"] == 504
+    assert elapsed < 1
+    assert results["leader"]["status"] == 504
+    assert mock_psm.get_point_set.call_count == 1
+
+
+def test_coalescing_budget_not_shared(mock_psm):
+    """Un budget court ne coupe pas le calcul d'un appelant sans échéance."""
+    release = threading.Event()
+    binary = make_pointSet([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+    def slow_get(pointset_id):
+        release.wait(5)
+        return {"status": 200, "PointSet": binary}
+
+    mock_psm.get_point_set.side_effect = slow_get
+    tr = CoalescingTriangulator(Triangulator(mock_psm))
+    results = {}
+    threads = [threading.Thread(target=lambda: results.setdefault(
+        "short", tr.triangulate("same-id", timeout=0.05))),
+        threading.Thread(target=lambda: results.setdefault(
+            "none", tr.triangulate("same-id")))]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results["short"]["status"] == 504
+    assert results["none"]["status"] == 200
+
+
+def test_coalescing_asyncio_shares_errors():
+    """Les appelants asyncio partagent le calcul, erreurs comprises."""
+    calls = []
+
+    def failing(key):
+        calls.append(key)
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    async def run():
+        flights = SingleFlight()
+        return await asyncio.gather(
+            *(flights.do_async("k", failing, "k") for _ in range(5)),
+            return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert calls == ["k"]
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_async_triangulator_bounds_compute():
+    """Les récupérations se chevauchent, le calcul est limité."""
+    binary = make_pointSet([(0, 0), (1, 0), (1, 1), (0, 1)])
+    active, peak, lock = [0], [0], threading.Lock()
+
+    async def get_point_set(pointset_id):
+        await asyncio.sleep(0.01)
+        return {"status": 200, "PointSet": binary}
+
+    def slow_engine(points):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return bowyer_watson(points)
+
+    manager = Mock()
+    manager.get_point_set = get_point_set
+    tr = AsyncTriangulator(manager, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(
+            *(tr.triangulate(f"id-{i}") for i in range(10)))
+
+    with patch("triangulator.triangulator.bowyer_watson", slow_engine):
+        results = asyncio.run(run())
+
+    assert peak[0] == 2
+    assert all(r["status"] == 200 for r in results)
+    assert bytes(results[0]["Triangulation"]) == bytes(
+        Triangulator(None).triangulate_binary(binary)["Triangulation"])
+
+
+def test_async_triangulator_errors(mock_psm):
+    """Mêmes statuts d'erreur que `Triangulator`, manager synchrone ou non."""
+
+    async def unreachable(pointset_id):
+        raise ConnectionError
+
+    manager = Mock()
+    manager.get_point_set = unreachable
+    res = asyncio.run(AsyncTriangulator(manager).triangulate("id"))
+    assert res["status"] == 503
+
+    mock_psm.get_point_set.return_value = {"status": 404}
+    res = asyncio.run(AsyncTriangulator(mock_psm).triangulate("id"))
+    assert res["status"] == 404
+
+    mock_psm.get_point_set.return_value = {
+        "status": 200, "PointSet": make_pointSet([(0, 0), (1, 1), (2, 2)])}
+    res = asyncio.run(AsyncTriangulator(mock_psm).triangulate("id"))
+    assert res == {"status": 400, "error": "The pointSet points form a segment"}
+
+
+def test_async_triangulator_process_pool(mock_psm):
+    """Le calcul peut s'exécuter dans un pool de processus."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        tr = AsyncTriangulator(mock_psm, executor=pool)
+        res = asyncio.run(tr.triangulate("id"))
+
+    assert res["status"] == 200
+    assert bytes(res["Triangulation"]) == bytes(
+        Triangulator(mock_psm).triangulate("id")["Triangulation"])
+
+
+def test_shared_memory_pool(mock_psm):
+    """Les moteurs tournent dans des processus ; résultat identique."""
+    rng = random.Random(3)
+    points = [(rng.random(), rng.random()) for _ in range(300)]
+    # Doublon : les indices reviennent à la numérotation d'origine
+    points.append(points[0])
+    binary = make_pointSet(points)
+    mock_psm.get_point_set.return_value = {"status": 200, "PointSet": binary}
+
+    with SharedMemoryPool(max_workers=2) as pool:
+        for engine in ("bowyer_watson", "sweep_hull"):
+            res = Triangulator(mock_psm, engine=engine,
+                               executor=pool).triangulate("id")
+            expected = Triangulator(mock_psm, engine=engine).triangulate("id")
+            assert res["status"] == 200
+            assert bytes(res["Triangulation"]) == bytes(
+                expected["Triangulation"])
+        assert len(pool.triangulate([(0, 0), (1, 0), (0, 1)])) == 1
+
+
+def test_shared_memory_pool_rebuilds_broken_pool():
+    """Un worker mort ne casse pas les appels suivants."""
+    with SharedMemoryPool(max_workers=1) as pool:
+        broken = pool._pool
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        triangles = pool.triangulate([(0, 0), (1, 0), (0, 1), (1, 1)])
+
+        assert pool._pool is not broken
+        assert len(triangles) == 2
+
+
+def test_divide_and_conquer_matches_sweep_hull():
+    """Bandes fusionnées : même triangulation que le balayage."""
+    rng = random.Random(11)
+    points = [(rng.random(), rng.random()) for _ in range(2000)]
+    expected = {frozenset(t) for t in sweep_hull(points)}
+    for slabs in (1, 2, 5):
+        triangles = divide_and_conquer(points, slabs=slabs, workers=1)
+        assert {frozenset(t) for t in triangles} == expected
+    assert is_delaunay(points, triangles)
+
+
+def test_divide_and_conquer_degenerate_slabs():
+    """Grille : des bandes entièrement alignées sont aussi fusionnées."""
+    points = [(x, y) for x in range(12) for y in range(9)]
+    random.Random(2).shuffle(points)
+    for slabs in (3, 12, 40):
+        triangles = divide_and_conquer(points, slabs=slabs, workers=1)
+        assert len(triangles) == 2 * 11 * 8
+        assert is_delaunay(points, triangles)
+
+
+def test_divide_and_conquer_processes(mock_psm):
+    """Bandes calculées dans des processus, moteur "divide_conquer"."""
+    rng = random.Random(5)
+    points = [(rng.random(), rng.random()) for _ in range(400)]
+    triangles = divide_and_conquer(points, slabs=3, workers=2)
+    assert {frozenset(t) for t in triangles} == {
+        frozenset(t) for t in sweep_hull(points)}
+
+    mock_psm.get_point_set.return_value = {"status": 200,
+                                           "PointSet": make_pointSet(points)}
+    res = Triangulator(mock_psm, engine="divide_conquer").triangulate("id")
+    assert res["status"] == 200
+    assert is_delaunay(tr_points(res), tr_triangles(res))
+
+
+def test_divide_and_conquer_reuses_pool():
+    """Le pool de processus est conservé d'un appel à l'autre."""
+    rng = random.Random(6)
+    points = [(rng.uniform(1e-20, 2e-20), rng.uniform(1e-20, 2e-20))
+              for _ in range(300)]
+    expected = {frozenset(t) for t in sweep_hull(points)}
+
+    for _ in range(2):
+        triangles = divide_and_conquer(points, slabs=4, workers=2)
+        assert {frozenset(t) for t in triangles} == expected
+    pool = divide_conquer._pools[2]
+    divide_and_conquer(points, slabs=2, workers=2)
+
+    assert divide_conquer._pools[2] is pool
+
+
+def test_triangulate_many_prefetches(mock_psm):
+    """Les récupérations se font pendant les calculs ; ordre conservé."""
+    pointsets = {f"id-{i}": make_pointSet([(0, 0), (1, 0), (0, 1), (i, i)])
+                 for i in range(1, 9)}
+    pointsets["missing"] = None
+    fetching, overlaps, lock = [0], [], threading.Lock()
+
+    def get_point_set(pointset_id):
+        with lock:
+            fetching[0] += 1
+        time.sleep(0.02)
+        with lock:
+            fetching[0] -= 1
+        if pointsets[pointset_id] is None:
+            return {"status": 404}
+        return {"status": 200, "PointSet": pointsets[pointset_id]}
+
+    def engine(points):
+        overlaps.append(fetching[0])
+        time.sleep(0.02)
+        return bowyer_watson(points)
+
+    mock_psm.get_point_set.side_effect = get_point_set
+    ids = ["id-1", "missing", *(f"id-{i}" for i in range(2, 9))]
+    with patch("triangulator.triangulator.bowyer_watson", engine):
+        results = list(Triangulator(mock_psm).triangulate_many(ids))
+
+    assert [pid for pid, _ in results] == ids
+    assert results[1][1]["status"] == 404
+    assert all(r["status"] == 200 for pid, r in results if pid != "missing")
+    assert max(overlaps) > 0  # des PointSets arrivaient pendant un calcul
+
+
+def test_triangulate_many_unordered(mock_psm):
+    """Sans ordre imposé, un PointSet lent ne bloque pas les suivants."""
+    binary = make_pointSet([(0, 0), (1, 0), (0, 1)])
+
+    def get_point_set(pointset_id):
+        time.sleep(0.3 if pointset_id == "slow" else 0.0)
+        return {"status": 200, "PointSet": binary}
+
+    mock_psm.get_point_set.side_effect = get_point_set
+    results = Triangulator(mock_psm).triangulate_many(
+        ["slow", "a", "b"], ordered=False)
+
+    assert [pid for pid, _ in results][-1] == "slow"
+
+
+def test_service_batch(mock_psm):
+    """POST /triangulations renvoie une ligne NDJSON par PointSet."""
+    binary = make_pointSet([(0, 0), (1, 0), (0, 1)])
+    mock_psm.get_point_set.side_effect = lambda pid: (
+        {"status": 200, "PointSet": binary} if pid == "ok"
+        else {"status": 404})
+    tr = Triangulator(mock_psm)
+    client = create_app(tr).test_client()
+
+    response = client.post("/triangulations",
+                           json={"pointSetIds": ["ok", "missing"]})
+    lines = [json.loads(line) for line in response.data.splitlines()]
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [line["pointSetId"] for line in lines] == ["ok", "missing"]
+    assert base64.b64decode(lines[0]["triangulation"]) == bytes(
+        tr.triangulate("ok")["Triangulation"])
+    assert lines[1]["code"] == "POINTSET_NOT_FOUND"
+    assert client.post("/triangulations", json=[1]).status_code == 400
+
+
+def test_incremental_insert_points():
+    """Reprise d'un résultat puis ajout : même résultat qu'un recalcul."""
+    rng = random.Random(8)
+    points = [(rng.random(), rng.random()) for _ in range(1000)]
+    new = [(rng.random() * 1.2, rng.random() * 1.2) for _ in range(200)]
+    inc = IncrementalTriangulation.from_triangulation(points,
+                                                      bowyer_watson(points))
+
+    indices = inc.insert_points(new + [points[3]])
+
+    assert indices == list(range(1000, 1200)) + [3]
+    assert {frozenset(t) for t in inc.triangles()} == {
+        frozenset(t) for t in bowyer_watson(points + new)}
+
+
+def test_incremental_resume_and_binary(mock_psm):
+    """L'état sauvegardé se reprend ; un binaire `Triangles` aussi."""
+    points = [(x, y) for x in range(8) for y in range(8)]
+    mock_psm.get_point_set.return_value = {"status": 200,
+                                           "PointSet": make_pointSet(points)}
+    res = Triangulator(mock_psm).triangulate("id")
+    inc = IncrementalTriangulation.from_binary(bytes(res["Triangulation"]))
+    assert inc.points == points
+    inc.insert_points([(3.5, 3.5), (9, 4)])
+
+    resumed = IncrementalTriangulation.loads(inc.dumps())
+    for tr in (inc, resumed):
+        tr.insert_points([(1.25, 6.5), (-2, -2)])
+    assert resumed.triangles() == inc.triangles()
+    assert is_delaunay(inc.points, inc.triangles())
+    assert inc.to_binary()[:4] == struct.pack("!I", 68)
+
+
+def test_incremental_resume_with_duplicates(mock_psm):
+    """Un résultat du service avec doublons se reprend, indices inchangés."""
+    points = [(x, y) for x in range(5) for y in range(5)]
+    points += [(2, 2), (0, 0)]
+    mock_psm.get_point_set.return_value = {"status": 200,
+                                           "PointSet": make_pointSet(points)}
+    response = create_app(Triangulator(mock_psm)).test_client().get(
+        f"/triangulation/{uuid.uuid4()}")
+    assert response.status_code == 200
+
+    inc = IncrementalTriangulation.from_binary(response.data)
+
+    assert inc.points == points
+    assert inc.to_binary() == response.data
+    resumed = IncrementalTriangulation.loads(inc.dumps())
+    for tr in (inc, resumed):
+        assert tr.insert_points([(0, 0), (2.5, 1.5)]) == [0, 27]
+    assert resumed.triangles() == inc.triangles()
+    assert len(inc.triangles()) == len(bowyer_watson(points[:25] + [(2.5, 1.5)]))
+    assert not {25, 26} & {v for t in inc.triangles() for v in t}
+    assert is_delaunay(inc.points, inc.triangles())
+
+
+def test_open_pointset_mmap(tmp_path, mock_psm):
+    """Fichier projeté en mémoire : vue float32, triangulation identique."""
+    pytest.importorskip("numpy")
+    points = [(0, 0), (1, 0), (1, 1), (0, 1), (0.25, 0.5)]
+    path = tmp_path / "pointset.bin"
+    path.write_bytes(make_pointSet(points))
+    mock_psm.get_point_set.return_value = {"status": 200,
+                                           "PointSet": make_pointSet(points)}
+    tr = Triangulator(mock_psm)
+
+    with open_pointset(path) as ps:
+        assert len(ps) == 5
+        assert ps.points.tolist() == [list(p) for p in points]
+        assert not ps.points.flags.writeable
+        res = tr.triangulate_binary(ps.binary)
+    assert bytes(res["Triangulation"]) == bytes(
+        tr.triangulate("id")["Triangulation"])
+
+    path.write_bytes(make_pointSet(points)[:-1])
+    with pytest.raises(InvalidPointSetBinary, match="Inconsistent size"):
+        open_pointset(path)
+
+
+def test_spool_pointset_stream():
+    """Un flux est recopié par morceaux ; sa taille est vérifiée."""
+    pytest.importorskip("numpy")
+    points = [(float(i), float(-i)) for i in range(100)]
+    binary = make_pointSet(points)
+
+    with spool_pointset(io.BytesIO(binary), chunk_size=64) as ps:
+        assert bytes(ps.binary) == binary
+        assert ps.points[99].tolist() == [99.0, -99.0]
+
+    for bad in (binary[:-3], binary + b"\x00", b"\x00"):
+        with pytest.raises(InvalidPointSetBinary):
+            spool_pointset(io.BytesIO(bad))
+
+
+def test_benchmark_distributions_and_fit():
+    """Distributions du banc et ajustement de l'exposant."""
+    for name, make in DISTRIBUTIONS.items():
+        points = make(500, random.Random(0))
+        assert len(points) == 500, name
+        assert len(set(points)) == 500, name
+
+    sizes = [1000, 10000, 100000]
+    assert fit_exponent(sizes, [2e-6 * n ** 1.5 for n in sizes]) == \
+        pytest.approx(1.5)
+    assert fit_exponent([1000], [0.1]) is None
+
+
+def test_benchmark_baseline_regression(tmp_path):
+    """Une phase plus lente que la référence (au-delà de la tolérance) échoue."""
+    report = run([300, 600], engines=["sweep_hull"],
+                 distributions=["uniform", "grid"])
+    assert len(report["results"]) == 4
+    assert set(report["exponents"]) == {"sweep_hull/uniform", "sweep_hull/grid"}
+
+    slow = json.loads(json.dumps(report))
+    slow["results"][0]["phases"]["triangulate"] += 1.0
+    [regression] = compare(slow, report, tolerance=0.25)
+    assert regression["phase"] == "triangulate"
+    assert compare(report, slow) == []
+
+    baseline = str(tmp_path / "baseline.json")
+    args = ["--sizes", "200", "--engines", "sweep_hull",
+            "--distributions", "uniform", "--baseline", baseline]
+    assert benchmark_main([*args, "--save-baseline"]) == 0
+    with open(baseline) as f:
+        saved = json.load(f)
+    saved["results"][0]["phases"]["triangulate"] = -1.0  # intenable
+    with open(baseline, "w") as f:
+        json.dump(saved, f)
+    assert benchmark_main(args) == 1
+
+    # Combinaisons refusées avant toute mesure
+    missing = ["--sizes", "200", "--baseline", str(tmp_path / "none.json")]
+    for argv in (missing, ["--sizes", "200", "--save-baseline"]):
+        with pytest.raises(SystemExit) as exc:
+            benchmark_main(argv)
+        assert exc.value.code == 2
+
+
+def test_observer_phases(mock_psm):
+    """L'observateur reçoit la durée de chaque phase et les tailles."""
+    events = []
+    tr = Triangulator(mock_psm, observer=lambda e, v: events.append((e, v)))
+
+    tr.triangulate(str(uuid.uuid4()))
+
+    seen = dict(events)
+    assert set(seen) == {"fetch_seconds", "payload_in_bytes",
+                         "deserialize_seconds", "points", "validate_seconds",
+                         "triangulate_seconds", "triangles",
+                         "serialize_seconds", "payload_out_bytes", "status"}
+    assert all(v >= 0 for e, v in events if e.endswith("_seconds"))
+    assert seen["points"] == 3 and seen["triangles"] == 1
+    assert seen["payload_in_bytes"] == 4 + 8 * 3
+    assert seen["status"] == 200
+
+    # Même contenu sous un autre identifiant : servi par le cache de
+    # contenu, sans phase de triangulation
+    tr.content_cache = ContentCache(1 << 20)
+    tr.triangulate(str(uuid.uuid4()))
+    events.clear()
+    assert tr.triangulate(str(uuid.uuid4()))["status"] == 200
+    assert "triangulate_seconds" not in dict(events)
+    tr.observer = None  # sans observateur, rien n'est mesuré
+    tr.triangulate("autre-id")
+    assert [v for e, v in events if e == "status"] == [200]
+
+
+def test_metrics_render():
+    """Histogrammes et compteurs au format texte de Prometheus."""
+    metrics = Metrics()
+    metrics("triangulate_seconds", 0.003)
+    metrics("triangulate_seconds", 2.0)
+    metrics("points", 42)
+    metrics("status", 200)
+    metrics("status", 404)
+    metrics("inconnu", 1)
+
+    text = metrics.render()
+    name = "triangulator_phase_seconds"
+    assert f"# TYPE {name} histogram" in text
+    assert f'{name}_bucket{{phase="triangulate",le="0.005"}} 1' in text
+    assert f'{name}_bucket{{phase="triangulate",le="2.5"}} 2' in text
+    assert f'{name}_bucket{{phase="triangulate",le="+Inf"}} 2' in text
+    assert f'{name}_count{{phase="triangulate"}} 2' in text
+    assert f'{name}_sum{{phase="triangulate"}} 2.003' in text
+    assert 'triangulator_points_bucket{le="100.0"} 1' in text
+    assert 'triangulator_results_total{status="404"} 1' in text
+    assert "inconnu" not in text
+
+
+def test_service_metrics(mock_psm):
+    """GET /metrics expose les mesures des triangulations servies."""
+    metrics = Metrics()
+    tr = Triangulator(mock_psm, observer=metrics)
+    client = create_app(tr, metrics).test_client()
+
+    client.get("/triangulation/some-id")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'triangulator_phase_seconds_bucket{phase="triangulate"' in text
+    assert 'triangulator_results_total{status="200"} 1' in text
+    assert create_app(tr).test_client().get("/metrics").status_code == 404
+
+
+def test_circuit_breaker_trips_and_recovers(mock_psm):
+    """Le disjoncteur s'ouvre sur les 503 et se referme après un essai."""
+    now = [0.0]
+    ok = mock_psm.get_point_set.return_value
+    down = {"status": 503, "error": "The PointSet storage layer is unavailable"}
+    breaker = CircuitBreaker(mock_psm, failure_rate=0.5, min_calls=4,
+                             window=4, reset_timeout=10.0,
+                             clock=lambda: now[0])
+
+    mock_psm.get_point_set.return_value = {"status": 404, "error": "x"}
+    for _ in range(4):  # 404 : le PointSetManager répond, pas d'échec
+        breaker.get_point_set("id")
+    assert breaker.state == "closed"
+
+    mock_psm.get_point_set.return_value = down
+    for _ in range(2):
+        breaker.get_point_set("id")
+    assert breaker.state == "open"
+
+    calls = mock_psm.get_point_set.call_count
+    now[0] = 4.0
+    result = breaker.get_point_set("id")
+    assert result["status"] == 503 and result["retry_after"] == 6.0
+    assert mock_psm.get_point_set.call_count == calls  # aucun appel
+    assert breaker.rejected == 1
+
+    now[0] = 10.0  # semi-ouvert : l'essai échoue, il se rouvre
+    assert breaker.get_point_set("id") is down
+    assert breaker.state == "open"
+
+    now[0] = 20.0
+    mock_psm.get_point_set.return_value = ok
+    assert breaker.get_point_set("id") is ok
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_exceptions_and_probes(mock_psm):
+    """Les exceptions comptent comme échecs ; un seul essai à la fois."""
+    now = [0.0]
+    breaker = CircuitBreaker(mock_psm, min_calls=2, window=2,
+                             reset_timeout=1.0, clock=lambda: now[0])
+    mock_psm.get_point_set.side_effect = TimeoutError
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breaker.get_point_set("id")
+    assert breaker.state == "open"
+
+    now[0] = 1.0
+    entered, release = threading.Event(), threading.Event()
+
+    def slow(pointset_id):
+        entered.set()
+        release.wait()
+        return {"status": 200, "PointSet": b""}
+
+    mock_psm.get_point_set.side_effect = slow
+    probe = threading.Thread(target=breaker.get_point_set, args=("id",))
+    probe.start()
+    entered.wait()
+    assert breaker.state == "half_open"
+    assert breaker.get_point_set("id")["status"] == 503  # essai en cours
+    release.set()
+    probe.join()
+    assert breaker.state == "closed"
+
+    with pytest.raises(ValueError):
+        CircuitBreaker(mock_psm, min_calls=30, window=20)
+
+
+def test_service_circuit_open_retry_after(mock_psm):
+    """Disjoncteur ouvert : 503 immédiate avec l'en-tête Retry-After."""
+    mock_psm.get_point_set.side_effect = ConnectionError
+    breaker = CircuitBreaker(mock_psm, min_calls=1, window=1,
+                             reset_timeout=30.0)
+    client = create_app(Triangulator(breaker)).test_client()
+
+    first = client.get("/triangulation/some-id")
+    assert first.status_code == 503
+    assert "Retry-After" not in first.headers
+
+    second = client.get("/triangulation/some-id")
+    assert second.status_code == 503
+    assert second.get_json()["code"] == "SERVICE_UNAVAILABLE"
+    assert 1 <= int(second.headers["Retry-After"]) <= 30
+    assert mock_psm.get_point_set.call_count == 1
+
+    line = json.loads(batch_line("some-id", breaker.open_result()))
+    assert line["status"] == 503 and line["retryAfter"] > 0
+
+
+@pytest.mark.parametrize("engine", ["bowyer_watson", "numpy", "sweep_hull",
+                                    "divide_conquer"])
+def test_engines_check_deadline(engine):
+    """Les moteurs vérifient l'échéance toutes les CHECK_EVERY insertions."""
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    triangulate_points = Triangulator.get_engine(engine)
+    rng = random.Random(3)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100))
+              for _ in range(CHECK_EVERY + 10)]
+
+    with pytest.raises(DeadlineExceeded):
+        triangulate_points(points, deadline=Deadline(0.0))
+
+    calls = []
+    deadline = Deadline(60.0, clock=lambda: calls.append(1) or 0.0)
+    assert sorted(map(sorted, triangulate_points(points, deadline=deadline))) \
+        == sorted(map(sorted, triangulate_points(points)))
+    assert 2 <= len(calls) - 1 <= 4  # création, puis quelques vérifications
+
+
+def test_triangulate_deadline_rejects_early(mock_psm):
+    """Coût estimé supérieur au budget : 504 sans lancer le moteur."""
+    rng = random.Random(4)
+    n = 20_000
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet([(rng.uniform(0, 1), rng.uniform(0, 1))
+                                   for _ in range(n)])
+    }
+    assert estimate_seconds(n, "bowyer_watson") > 0.01
+    engine = Mock()
+    with patch("triangulator.triangulator.bowyer_watson", engine):
+        res = Triangulator(mock_psm).triangulate("id", timeout=0.01)
+    assert res["status"] == 504
+    assert res["error"].startswith("Deadline exceeded")
+    engine.assert_not_called()
+
+
+def test_triangulate_deadline_aborts_engine():
+    """Échéance passée pendant le calcul : le moteur s'arrête (504)."""
+    rng = random.Random(5)
+    binary = make_pointSet([(rng.uniform(0, 1), rng.uniform(0, 1))
+                            for _ in range(3000)])
+    times = iter([0.0, 0.0])  # création, estimation ; puis l'échéance passe
+    deadline = Deadline(1.0, clock=lambda: next(times, 100.0))
+
+    res = Triangulator(None).triangulate_binary(binary, deadline=deadline)
+
+    assert res["status"] == 504
+    assert "during triangulation" in res["error"]
+    ok = Triangulator(None).triangulate_binary(binary, deadline=Deadline(60))
+    assert ok["status"] == 200
+
+
+def test_service_timeout(mock_psm):
+    """?timeout= : budget de la requête ; invalide : 400 ; dépassé : 504."""
+    client = create_app(Triangulator(mock_psm), timeout=60).test_client()
+    assert client.get("/triangulation/id").status_code == 200
+    assert client.get("/triangulation/id?timeout=abc").status_code == 400
+    assert client.get("/triangulation/id?timeout=-1").status_code == 400
+
+    mock_psm.get_point_set.return_value = {
+        "status": 200,
+        "PointSet": make_pointSet([(float(i), float(i % 7))
+                                   for i in range(20_000)])
+    }
+    response = client.get("/triangulation/big?timeout=0.001")
+    assert response.status_code == 504
+    assert response.get_json()["code"] == "DEADLINE_EXCEEDED"
+
+
+def test_async_triangulator_timeout():
+    """La récupération asynchrone est abandonnée à l'échéance."""
+    class SlowManager:
+        async def get_point_set(self, pointset_id):
+            await asyncio.sleep(5)
+
+    start = time.perf_counter()
+    res = asyncio.run(AsyncTriangulator(SlowManager()).triangulate(
+        "id", timeout=0.05))
+    assert res["status"] == 504
+    assert time.perf_counter() - start < 2
+
+
+def _queue_jobs(scheduler, sizes, order, engine="sweep_hull"):
+    """Lance un thread par taille ; chacun attend son admission."""
+    threads = []
+    for n in sizes:
+        def job(n=n):
+            with scheduler.admit(n, engine):
+                order.append(n)
+        thread = threading.Thread(target=job)
+        thread.start()
+        threads.append(thread)
+        while scheduler.waiting() < len(threads):
+            time.sleep(0.001)
+    return threads
+
+
+def test_scheduler_shortest_job_first():
+    """Plus petits PointSets d'abord ; le vieillissement évite la famine."""
+    scheduler = Scheduler(slots=1)
+    order = []
+    with scheduler.admit(10, "sweep_hull"):
+        threads = _queue_jobs(scheduler, [50_000, 10, 5_000], order)
+    for thread in threads:
+        thread.join()
+    assert order == [10, 5_000, 50_000]
+    assert scheduler.running == 0 and scheduler.memory_used == 0
+
+    now = [0.0]
+    scheduler = Scheduler(slots=1, aging=1.0, clock=lambda: now[0])
+    order = []
+    with scheduler.admit(10, "sweep_hull"):
+        threads = _queue_jobs(scheduler, [50_000], order)
+        now[0] = 100.0  # le gros calcul attend depuis 100 s
+        threads += _queue_jobs(scheduler, [10], order)
+    for thread in threads:
+        thread.join()
+    assert order == [50_000, 10]
+
+
+def test_scheduler_memory_budget_and_deadline():
+    """Budget mémoire : refus ou attente ; échéance dépassée en attente."""
+    budget = estimate_bytes(1000, "sweep_hull") * 3 // 2
+    scheduler = Scheduler(slots=2, memory_budget=budget, max_waiting=1)
+    with pytest.raises(AdmissionRejected), scheduler.admit(2000, "sweep_hull"):
+        pass
+
+    order = []
+    with scheduler.admit(1000, "sweep_hull"):
+        threads = _queue_jobs(scheduler, [1000], order)  # mémoire occupée
+        assert order == []
+        with pytest.raises(AdmissionRejected), \
+                scheduler.admit(10, "sweep_hull"):  # file pleine
+            pass
+    threads[0].join()
+    assert order == [1000]
+    assert scheduler.rejected == 2
+
+    scheduler = Scheduler(slots=1)
+    with scheduler.admit(10, "sweep_hull"):
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded), \
+                scheduler.admit(10, "sweep_hull", Deadline(0.05)):
+            pass
+        assert time.perf_counter() - start < 1
+        assert scheduler.waiting() == 0
+
+
+def test_triangulator_scheduler(mock_psm):
+    """Le Triangulator passe par l'ordonnanceur ; un refus donne 503."""
+    scheduler = Scheduler()
+    assert Triangulator(mock_psm, scheduler=scheduler) \
+        .triangulate("id")["status"] == 200
+    assert scheduler.running == 0
+
+    tr = Triangulator(mock_psm, scheduler=Scheduler(memory_budget=10))
+    res = tr.triangulate("id")
+    assert res["status"] == 503
+    assert "budget" in res["error"]
+
+
 @pytest.mark.perf
 def test_stress_triangulator(mock_psm):
     """Test de stress."""
@@ -262,3 +1781,11 @@ def test_large_triangulation(mock_psm):
     print(f"Triangulation de {n_points} points exécutée en {end - start:.2f}s")
 
     assert res["status"] == 200
+
+
+@pytest.mark.perf
+def test_benchmark_scaling():
+    """Passage à l'échelle : quasi linéaire pour toutes les distributions."""
+    report = run([2000, 8000, 32000], engines=["sweep_hull", "bowyer_watson"])
+    for key, fitted in report["exponents"].items():
+        assert fitted["triangulate"] < 1.4, key
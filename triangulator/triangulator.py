@@ -1,7 +1,26 @@
 """Implementation du triangulator."""
 import struct
-
-from triangulator.delaunay import bowyer_watson
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain
+
+from triangulator.cache import content_key
+from triangulator.deadline import Deadline, DeadlineExceeded, estimate_seconds
+from triangulator.delaunay import bowyer_watson, bowyer_watson_numpy
+from triangulator.divide_conquer import divide_and_conquer
+from triangulator.scheduler import AdmissionRejected
+from triangulator.sweephull import sweep_hull
+from triangulator.validation import (
+    InvalidPointSet,
+    is_collinear,
+    remap_triangles,
+    validate_points,
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : repli sur struct
+    np = None
 
 # Il faut aussi simuler un problème de communication avec le PS
 
@@ -18,24 +37,101 @@ class InvalidPointSetBinary(Exception):
 class Triangulator:
     """Classe permettant de trianguler un PointSet."""
 
-    def __init__(self, pointset_manager):
+    def __init__(self, pointset_manager, use_numpy=True,
+                 engine="bowyer_watson", duplicates="merge", tolerance=0.0,
+                 cache=None, content_cache=None, executor=None,
+                 observer=None, scheduler=None):
         """Le triangulator dépend du pointset_manager.
 
         Mais ne connaît pas son implémentation réelle.
+        `use_numpy` active la désérialisation sans copie si NumPy est installé.
+        `engine` choisit l'algorithme de triangulation (voir `get_engine`).
+        `duplicates` ("merge" ou "reject") et `tolerance` règlent le
+        traitement des doublons (voir `validate_points`).
+        `cache` (un `ResultCache`, optionnel) garde les résultats par
+        (pointSetId, moteur) ; `content_cache` (un `ContentCache`) les garde
+        par contenu du PointSet, quel que soit son identifiant.
+        `executor` (un `SharedMemoryPool`, optionnel) exécute les moteurs
+        dans des processus.
+        `observer(événement, valeur)` (optionnel, par exemple un `Metrics`)
+        reçoit la durée de chaque phase, les tailles et les statuts (voir
+        `observe`).
+        `scheduler` (un `Scheduler`, optionnel) ordonne les calculs selon
+        la taille des PointSets (voir `compute`).
         """
         self.manager = pointset_manager
+        self.use_numpy = use_numpy and np is not None
+        self.get_engine(engine)  # nom inconnu : erreur dès la construction
+        self.engine = engine
+        if duplicates not in ("merge", "reject"):
+            raise ValueError(f"Unknown duplicates policy: {duplicates}")
+        self.duplicates = duplicates
+        self.tolerance = tolerance
+        self.cache = cache
+        self.content_cache = content_cache
+        self.executor = executor
+        self.observer = observer
+        self.scheduler = scheduler
+
+    def observe(self, event, value):
+        """Transmet une mesure à l'observateur, s'il y en a un.
+
+        Événements : "<phase>_seconds" (phases fetch, deserialize,
+        validate, triangulate, serialize), "points", "triangles",
+        "payload_in_bytes", "payload_out_bytes" et "status".
+        """
+        if self.observer is not None:
+            self.observer(event, value)
 
-    def deserialize_pointset(self, binary):
-        """1. DESERIALIZATION."""
+    @staticmethod
+    def get_engine(name):
+        """Retourne la fonction de triangulation associée à `name`.
+
+        - "bowyer_watson" : maillage avec voisinage (pur Python)
+        - "numpy" : Bowyer-Watson vectorisé, nécessite NumPy ; O(n²), moteur
+          de référence pour les petits PointSets
+        - "sweep_hull" : balayage d'enveloppe type Delaunator, O(n log n)
+        - "divide_conquer" : bandes triangulées en parallèle puis fusionnées
+          (Guibas-Stolfi), pour les très grands PointSets
+        """
+        engines = {
+            "bowyer_watson": bowyer_watson,
+            "numpy": bowyer_watson_numpy,
+            "sweep_hull": sweep_hull,
+            "divide_conquer": divide_and_conquer,
+        }
+        if name not in engines:
+            raise ValueError(f"Unknown triangulation engine: {name}")
+        if name == "numpy" and np is None:
+            raise ValueError("The 'numpy' engine requires NumPy")
+        return engines[name]
+
+    @staticmethod
+    def read_header(binary):
+        """Lit N et vérifie la taille du binaire."""
         if len(binary) < 4:
             raise InvalidPointSetBinary("Binary too short: cannot read N")
 
-        n = struct.unpack("!I", binary[:4])[0]
+        n = struct.unpack_from("!I", binary)[0]
 
         if len(binary) != 4 + 8 * n:
             raise InvalidPointSetBinary(f"Inconsistent size: "
                                         f"expected {4 + 8 * n} bytes,"
                                         f" got {len(binary)}")
+        return n
+
+    def deserialize_pointset_array(self, binary):
+        """1. DESERIALIZATION sans copie : tableau NumPy (N, 2) float32.
+
+        Le tableau est une vue en lecture sur `binary`.
+        """
+        n = self.read_header(binary)
+        return np.frombuffer(binary, dtype=">f4", count=2 * n,
+                             offset=4).reshape(n, 2)
+
+    def deserialize_pointset(self, binary):
+        """1. DESERIALIZATION."""
+        n = self.read_header(binary)
 
         points = []
         offset = 4
@@ -46,11 +142,41 @@ class Triangulator:
 
         return points
 
+    @staticmethod
+    def _is_array(values):
+        """Vrai si `values` est un tableau NumPy."""
+        return np is not None and isinstance(values, np.ndarray)
+
+    @staticmethod
+    def write_points(buf, offset, points):
+        """Écrit un PointSet (N puis les N couples x, y) dans `buf` à `offset`."""
+        n = len(points)
+        struct.pack_into("!I", buf, offset, n)
+        if Triangulator._is_array(points):
+            view = np.frombuffer(buf, dtype=">f4", count=2 * n, offset=offset + 4)
+            view[:] = points.reshape(-1)
+        else:
+            struct.pack_into(f"!{2 * n}f", buf, offset + 4,
+                             *chain.from_iterable(points))
+        return offset + 4 + 8 * n
+
+    @staticmethod
+    def write_triangles(buf, offset, triangles):
+        """Écrit T puis les T triplets d'indices dans `buf` à `offset`."""
+        t = len(triangles)
+        struct.pack_into("!I", buf, offset, t)
+        if Triangulator._is_array(triangles):
+            view = np.frombuffer(buf, dtype=">u4", count=3 * t, offset=offset + 4)
+            view[:] = triangles.reshape(-1)
+        else:
+            struct.pack_into(f"!{3 * t}I", buf, offset + 4,
+                             *chain.from_iterable(triangles))
+        return offset + 4 + 12 * t
+
     def serialize_triangles(self, triangles):
         """2. SERIALIZATION."""
-        binary = struct.pack("!I", len(triangles))
-        for a, b, c in triangles:
-            binary += struct.pack("!III", a, b, c)
+        binary = bytearray(4 + 12 * len(triangles))
+        self.write_triangles(binary, 0, triangles)
         return binary
 
     def serialize_pointset(self, points):
@@ -58,46 +184,62 @@ class Triangulator:
 
         Retourne un flux binaire conforme à la spec.
         """
-        nb_points = len(points)
-        binary = struct.pack("!I", nb_points)
+        binary = bytearray(4 + 8 * len(points))
+        self.write_points(binary, 0, points)
+        return binary
 
-        for x, y in points:
-            binary += struct.pack("!ff", x, y)
+    def serialize_triangulation(self, points, triangles):
+        """Format `Triangles` de la spec : sommets puis triangles.
 
-        return binary
+        La taille est calculée à l'avance et le tout est écrit dans un seul
+        tampon. Retourne (tampon, début de la partie triangles).
+        """
+        split = 4 + 8 * len(points)
+        binary = bytearray(split + 4 + 12 * len(triangles))
+        self.write_points(binary, 0, points)
+        self.write_triangles(binary, split, triangles)
+        return binary, split
 
     @staticmethod
     def is_segment(points):
         """Vérifie si tous les points sont alignés (forment un segment)."""
-        n = len(points)
-
-        # Choisir les deux premiers points pour définir la droite
-        x0, y0 = points[0]
-        x1, y1 = points[1]
+        return is_collinear(points)
 
-        # Comparer tous les autres points
-        for i in range(2, n):
-            x, y = points[i]
-            # Aire du triangle formé par (p0,p1,pi) = 0 si colinéaire
-            if (x1 - x0) * (y - y0) - (y1 - y0) * (x - x0) != 0:
-                return False
-        return True
+    def fetch_pointset(self, pointset_id):
+        """Récupère le PointSet binaire auprès du PointSetManager.
 
-    def triangulate(self, pointset_id):
-        """TRIANGULATION (simple ear clipping or placeholder)."""
+        Retourne (binaire, None), ou (None, dict d'erreur).
+        """
         # --- Communication avec le PointSetManager ---
+        start = time.perf_counter()
         try:
             db_result = self.manager.get_point_set(pointset_id)
         except Exception:
             # Communication failure (timeout, connection error, etc.)
-            return {
-                "status": 503,
-                "error": "Service unavailable: "
-                         "communication with PointSetManager failed"
-            }
+            return None, self.manager_unavailable()
+        finally:
+            self.observe("fetch_seconds", time.perf_counter() - start)
+        return self.read_manager_result(db_result)
+
+    @staticmethod
+    def manager_unavailable():
+        """Erreur 503 : le PointSetManager n'a pas pu être joint."""
+        return {
+            "status": 503,
+            "error": "Service unavailable: "
+                     "communication with PointSetManager failed"
+        }
+
+    @staticmethod
+    def deadline_exceeded(message):
+        """Erreur 504 : la triangulation ne tient pas dans son échéance."""
+        return {"status": 504, "error": f"Deadline exceeded: {message}"}
 
+    @staticmethod
+    def read_manager_result(db_result):
+        """Interprète la réponse du PointSetManager : (binaire, erreur)."""
         if db_result["status"] == 404:
-            return {
+            return None, {
                 "status": 404,
                 "error": "PointSet not found (as reported by the PointSetManager)"
             }
@@ -108,40 +250,212 @@ class Triangulator:
         """
         # layer (database) is unavailable"}
         if db_result["status"] != 200:
-            return db_result
+            return None, db_result
+
+        return db_result["PointSet"], None
+
+    def triangulate_binary(self, binary, engine=None, deadline=None):
+        """Triangule un PointSet binaire déjà récupéré ; retourne un dict de statut.
 
+        Avec `deadline` (une `Deadline`), la requête est refusée (504) si
+        l'estimation de son coût (voir `estimate_seconds`) dépasse le temps
+        restant, et le moteur s'arrête (504) une fois l'échéance passée.
+        """
+        engine = engine or self.engine
+        triangulate_points = self.get_engine(engine)
+        clock = time.perf_counter
+        self.observe("payload_in_bytes", len(binary))
+
+        options = {}
+        if deadline is not None:
+            try:
+                n = self.read_header(binary)
+            except InvalidPointSetBinary as e:
+                return {"status": 400, "error": str(e)}
+            estimate, remaining = estimate_seconds(n, engine), \
+                deadline.remaining()
+            if estimate > remaining:
+                return self.deadline_exceeded(
+                    f"triangulating {n} points needs about {estimate:.2f}s,"
+                    f" {remaining:.2f}s left")
+            options["deadline"] = deadline
+
+        start = clock()
         try:
-            points = self.deserialize_pointset(db_result["PointSet"])
+            if self.use_numpy:
+                points = self.deserialize_pointset_array(binary)
+            else:
+                points = self.deserialize_pointset(binary)
         except InvalidPointSetBinary as e:
             return {"status": 400, "error": str(e)}
+        finally:
+            self.observe("deserialize_seconds", clock() - start)
+        self.observe("points", len(points))
 
-        if len(points) < 3:
-            return {
-                "status": 400,
-                "error": "Not enough points to triangulate"
-            }
-
-        if Triangulator.is_segment(points):
-            return {"status": 400,
-                    "error": " The pointSet points form a segment"
-                    }
+        # Validation : NaN/inf, doublons, nombre de points, alignement
+        start = clock()
+        try:
+            unique, kept = validate_points(points, self.tolerance,
+                                           self.duplicates)
+        except InvalidPointSet as e:
+            return {"status": 400, "error": e.message}
+        finally:
+            self.observe("validate_seconds", clock() - start)
 
         # Triangulation
         # --- Internal failure can occur here ---
+        start = clock()
         try:
-            triangles = bowyer_watson(points)
+            if self.executor is not None:
+                triangles = self.executor.triangulate(unique, engine, **options)
+            else:
+                triangles = triangulate_points(unique, **options)
+            if kept is not None:
+                triangles = remap_triangles(triangles, kept)
+        except DeadlineExceeded as e:
+            return self.deadline_exceeded(e.message)
         except Exception:
 
             return {"status": 500,
                     "error": "Internal triangulation failure"
                     }
+        finally:
+            self.observe("triangulate_seconds", clock() - start)
+        self.observe("triangles", len(triangles))
 
-        # Serialization
-        tri_bin = self.serialize_triangles(triangles)
-        ps_bin = self.serialize_pointset(points)
+        # Serialization : un seul tampon, les parties sont des vues dessus
+        start = clock()
+        binary, _ = self.serialize_triangulation(points, triangles)
+        self.observe("serialize_seconds", clock() - start)
+        self.observe("payload_out_bytes", len(binary))
+        return self.result_from_binary(binary)
 
+    @staticmethod
+    def result_from_binary(binary):
+        """Construit le dict de statut 200 d'un binaire au format `Triangles`."""
+        n = struct.unpack_from("!I", binary)[0]
+        split = 4 + 8 * n
+        view = memoryview(binary).toreadonly()
         return {
             "status": 200,
-            "Triangles": tri_bin,
-            "PointSet": ps_bin,
-        }
\ No newline at end of file
+            "Triangles": view[split:],
+            "PointSet": view[:split],
+            "Triangulation": view,
+        }
+
+    def triangulate(self, pointset_id, engine=None, timeout=None):
+        """TRIANGULATION avec le moteur `engine` (par défaut celui du constructeur).
+
+        Avec un cache, un PointSet déjà triangulé (les PointSets sont
+        immuables) est servi sans appel au PointSetManager ni calcul ; avec
+        un cache de contenu, un même nuage de points enregistré sous un autre
+        identifiant n'est pas recalculé.
+        `timeout` (secondes) couvre la récupération et le calcul : au-delà,
+        le statut est 504 (voir `triangulate_binary`). La récupération n'est
+        pas interrompue (voir les délais du client) mais consomme le budget.
+        """
+        engine = engine or self.engine
+        self.get_engine(engine)
+        deadline = None if timeout is None else Deadline(timeout)
+        result, binary = self._lookup(pointset_id, engine)
+        if result is None:
+            result = self._triangulate_fetched(pointset_id, engine, binary,
+                                               deadline)
+        self.observe("status", result["status"])
+        return result
+
+    def _lookup(self, pointset_id, engine):
+        """Cherche le résultat en cache, sinon récupère le PointSet.
+
+        Retourne (résultat, None) : résultat en cache ou erreur du manager ;
+        ou (None, binaire) s'il reste à trianguler.
+        """
+        if self.cache is not None:
+            cached = self.cache.get((pointset_id, engine))
+            if cached is not None:
+                return dict(cached), None
+        binary, error = self.fetch_pointset(pointset_id)
+        return error, binary
+
+    def _triangulate_fetched(self, pointset_id, engine, binary, deadline=None):
+        """Triangule un PointSet récupéré, en passant par les caches."""
+        if self.content_cache is None:
+            result = self.compute(binary, engine, deadline)
+        else:
+            content = content_key(binary, engine, self.duplicates,
+                                  self.tolerance)
+            data = self.content_cache.get(content)
+            if data is not None:
+                result = self.result_from_binary(data)
+            else:
+                result = self.compute(binary, engine, deadline)
+                if result["status"] == 200:
+                    self.content_cache.put(content, result["Triangulation"])
+
+        if self.cache is not None and result["status"] == 200:
+            self.cache.put((pointset_id, engine), result,
+                           result["Triangulation"].nbytes)
+            result = dict(result)
+        return result
+
+    def compute(self, binary, engine, deadline=None):
+        """Triangule après admission par l'ordonnanceur, s'il y en a un.
+
+        N est lu dans l'en-tête avant tout calcul ; un refus de
+        l'ordonnanceur donne 503, une échéance intenable 504.
+        """
+        if self.scheduler is None:
+            return self.triangulate_binary(binary, engine, deadline)
+        try:
+            n = self.read_header(binary)
+        except InvalidPointSetBinary as e:
+            return {"status": 400, "error": str(e)}
+        try:
+            with self.scheduler.admit(n, engine, deadline):
+                return self.triangulate_binary(binary, engine, deadline)
+        except AdmissionRejected as e:
+            return {"status": 503, "error": f"Service unavailable: {e.message}"}
+        except DeadlineExceeded as e:
+            return self.deadline_exceeded(e.message)
+
+    def triangulate_many(self, pointset_ids, engine=None, prefetch=4,
+                         ordered=True):
+        """TRIANGULATION d'une série de PointSets ; génère (pointSetId, dict).
+
+        Jusqu'à `prefetch` PointSets sont récupérés par des threads pendant
+        que les précédents sont triangulés : la durée totale tend vers
+        max(récupération, calcul) au lieu de leur somme. Avec `ordered`,
+        les résultats suivent l'ordre de `pointset_ids` ; sinon ils sont
+        produits dès que leur récupération se termine.
+        """
+        engine = engine or self.engine
+        self.get_engine(engine)
+        ids = iter(pointset_ids)
+        pending = {}  # Future -> pointSetId, dans l'ordre de soumission
+        pool = ThreadPoolExecutor(prefetch)
+
+        def submit():
+            for pointset_id in ids:
+                future = pool.submit(self._lookup, pointset_id, engine)
+                pending[future] = pointset_id
+                return
+
+        try:
+            for _ in range(prefetch):
+                submit()
+            while pending:
+                if ordered:
+                    future = next(iter(pending))
+                else:
+                    future = next(iter(wait(pending,
+                                            return_when=FIRST_COMPLETED)[0]))
+                pointset_id = pending.pop(future)
+                submit()
+                result, binary = future.result()
+                if result is None:
+                    result = self._triangulate_fetched(pointset_id, engine,
+                                                       binary)
+                self.observe("status", result["status"])
+                yield pointset_id, result
+        finally:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,221 @@
+"""Validation d'un PointSet avant triangulation.
+
+Une passe avant le calcul coûteux : coordonnées non finies, doublons
+(exacts ou à une tolérance près, via une grille de hachage) et points tous
+alignés. Avec NumPy, les doublons exacts sont cherchés par un tri
+vectorisé (O(n log n)) et la grille est construite en bloc.
+"""
+import math
+
+from triangulator.geometry import CCW_ERRBOUND, orient2d
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : repli sur des boucles Python
+    np = None
+
+
+class InvalidPointSet(Exception):
+    """PointSet impossible à trianguler."""
+
+    def __init__(self, message):
+        """Init."""
+        super().__init__(message)
+        self.message = message
+
+
+def _is_array(points):
+    """Vrai si `points` est un tableau NumPy."""
+    return np is not None and isinstance(points, np.ndarray)
+
+
+def check_finite(points):
+    """Lève InvalidPointSet si une coordonnée est NaN ou infinie."""
+    if _is_array(points):
+        finite = bool(np.isfinite(points).all())
+    else:
+        finite = all(math.isfinite(x) and math.isfinite(y) for x, y in points)
+    if not finite:
+        raise InvalidPointSet("PointSet contains NaN or infinite coordinates")
+
+
+# Comparaisons par point au-delà desquelles `_close_pairs` renonce
+PAIRS_PER_POINT = 16
+
+
+def _close_pairs(pts, tolerance):
+    """Retourne les paires (i, j), i < j, à moins de `tolerance`, ou None.
+
+    Les points sont rangés par case de la grille de pas `tolerance` (tri
+    vectorisé) ; chaque point est comparé en bloc à ceux de sa case et des
+    4 cases voisines suivantes. None si les numéros de case ne tiennent
+    pas dans un entier 64 bits, ou si les cases sont si pleines que les
+    comparaisons dépasseraient `PAIRS_PER_POINT` par point (la boucle de
+    `unique_indices`, qui ne compare qu'aux points gardés, est alors
+    meilleure).
+    """
+    with np.errstate(over="ignore", invalid="ignore"):
+        cells = np.floor(pts / tolerance)
+    if not np.isfinite(cells).all():
+        return None
+    cells -= cells.min(axis=0) - 1
+    width = cells[:, 1].max() + 2
+    if (cells[:, 0].max() + 2) * width >= 2.0 ** 62:
+        return None
+    cells = cells.astype(np.int64)
+    width = int(width)
+    keys = cells[:, 0] * width + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    tol2 = tolerance * tolerance
+    pairs = []
+    budget = PAIRS_PER_POINT * len(order)
+    for offset in (0, width - 1, width, width + 1, 1):
+        start = np.searchsorted(sorted_keys, sorted_keys + offset, "left")
+        if offset == 0:
+            start = np.arange(len(order)) + 1  # suivants de la même case
+        end = np.searchsorted(sorted_keys, sorted_keys + offset, "right")
+        counts = np.maximum(end - start, 0)
+        total = int(counts.sum())
+        budget -= total
+        if budget < 0:
+            return None
+        if not total:
+            continue
+        a = np.repeat(np.arange(len(order)), counts)
+        b = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) \
+            + np.repeat(start, counts)
+        i, j = order[a], order[b]
+        d2 = (pts[i, 0] - pts[j, 0]) ** 2 + (pts[i, 1] - pts[j, 1]) ** 2
+        close = d2 <= tol2
+        pairs.append(np.sort(np.stack((i[close], j[close]), axis=1), axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs)
+
+
+def unique_indices(points, tolerance=0.0):
+    """Retourne les indices des points gardés, ou None sans doublon.
+
+    Seule la première occurrence d'un point est gardée.
+
+    Avec `tolerance` > 0, un point à moins de `tolerance` d'un point déjà
+    gardé est considéré comme un doublon (grille de hachage de pas
+    `tolerance`, seules les 9 cases voisines sont examinées).
+
+    Avec un tableau NumPy, les doublons exacts sont trouvés par
+    `np.unique` (tri, O(n log n)) ; avec une tolérance, les paires proches
+    sont trouvées en bloc (`_close_pairs`) et seuls les points concernés
+    passent par une boucle Python. Sinon, une passe O(n) en Python.
+    """
+    n = len(points)
+    if tolerance == 0 and _is_array(points):
+        pts = points.astype(np.float64) + 0.0  # -0.0 devient 0.0
+        _, first = np.unique(pts, axis=0, return_index=True)
+        if len(first) == n:
+            return None
+        return np.sort(first)
+    if _is_array(points):
+        pairs = _close_pairs(points.astype(np.float64), tolerance)
+        if pairs is not None:
+            if not len(pairs):
+                return None
+            # Un point est un doublon s'il est proche d'un point gardé
+            # d'indice plus petit : décision dans l'ordre des indices
+            earlier = {}
+            for i, j in pairs.tolist():
+                earlier.setdefault(j, []).append(i)
+            dropped = set()
+            for j in sorted(earlier):
+                if any(i not in dropped for i in earlier[j]):
+                    dropped.add(j)
+            if not dropped:
+                return None
+            keep = np.ones(n, dtype=bool)
+            keep[list(dropped)] = False
+            return np.flatnonzero(keep)
+
+    if hasattr(points, "tolist"):
+        points = points.tolist()
+
+    kept = []
+    if tolerance == 0:
+        seen = set()
+        for i, (x, y) in enumerate(points):
+            key = (x, y)
+            if key not in seen:
+                seen.add(key)
+                kept.append(i)
+    else:
+        tol2 = tolerance * tolerance
+        cells = {}
+        for i, (x, y) in enumerate(points):
+            cx = math.floor(x / tolerance)
+            cy = math.floor(y / tolerance)
+            duplicate = any(
+                (x - points[j][0]) ** 2 + (y - points[j][1]) ** 2 <= tol2
+                for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                for j in cells.get((cx + dx, cy + dy), ()))
+            if not duplicate:
+                cells.setdefault((cx, cy), []).append(i)
+                kept.append(i)
+
+    return None if len(kept) == n else kept
+
+
+def is_collinear(points):
+    """Vrai si tous les points sont alignés sur la droite (p0, p1).
+
+    p0 et p1 doivent être distincts. Avec NumPy, orient2d est évalué en un
+    seul passage vectorisé ; seuls les cas douteux sont recalculés en exact.
+    """
+    if _is_array(points):
+        pts = points.astype(np.float64)
+        x0, y0 = pts[0]
+        x1, y1 = pts[1]
+        detleft = (x0 - pts[:, 0]) * (y1 - pts[:, 1])
+        detright = (y0 - pts[:, 1]) * (x1 - pts[:, 0])
+        det = detleft - detright
+        bound = CCW_ERRBOUND * (np.abs(detleft) + np.abs(detright))
+        if (np.abs(det) > bound).any():
+            return False
+        points = pts.tolist()
+
+    p0 = points[0]
+    p1 = points[1]
+    # Aire du triangle formé par (p0,p1,pi) = 0 si colinéaire
+    return all(orient2d(p0, p1, points[i]) == 0 for i in range(2, len(points)))
+
+
+def validate_points(points, tolerance=0.0, duplicates="merge"):
+    """Vérifie et nettoie les points ; retourne (points, kept).
+
+    `kept` contient les indices d'origine des points gardés, ou None si
+    aucun point n'a été retiré. `duplicates` vaut "merge" (les doublons
+    sont retirés) ou "reject" (InvalidPointSet).
+    """
+    check_finite(points)
+
+    kept = unique_indices(points, tolerance)
+    if kept is not None:
+        if duplicates == "reject":
+            raise InvalidPointSet("PointSet contains duplicate points")
+        points = points[kept] if _is_array(points) else \
+            [points[i] for i in kept]
+
+    if len(points) < 3:
+        raise InvalidPointSet("Not enough points to triangulate")
+
+    if is_collinear(points):
+        raise InvalidPointSet("The pointSet points form a segment")
+
+    return points, kept
+
+
+def remap_triangles(triangles, kept):
+    """Ramène les indices des triangles à la numérotation d'origine."""
+    if _is_array(triangles) or _is_array(kept):
+        return np.asarray(kept)[np.asarray(triangles, dtype=np.int64)
+                                .reshape(-1, 3)]
+    return [(kept[a], kept[b], kept[c]) for a, b, c in triangles]